@@ -1,7 +1,8 @@
 # A file to contain all code relating to algorithms the program can visualise to the user.
 
 from operations import ChangeProperty
-from functions import GetElement, NodeFromID
+from functions import GetElement, NodeFromID, UpdateSelection, RefreshLabels
+from solver import BuildView, DistanceHeuristic, Landmarks, LandmarkHeuristic, Search, BidirectionalSearch, FORWARD, BACKWARD
 import math
 
 # This will be used to represent a step in an algorithm visualisation
@@ -13,6 +14,66 @@ class Step:
     def __repr__(self):
         return self.explanation
 
+# Holds the steps of an algorithm visualisation which are produced by a generator
+# Steps are only created when they are first needed and are kept so the user can move back through them
+class StepBuffer:
+    def __init__(self,generator,interval):
+        self.generator = generator
+        self.steps = [] # All steps which have been produced so far
+        self.exhausted = False # Becomes true once the generator has produced its final step
+        # Checkpoints of the graph are recorded as the steps are applied so any step can be quickly returned to
+        self.interval = interval # The number of steps between each checkpoint
+        self.checkpoints = {} # Maps a step number onto the values of every property changed up to that step
+        self.originals = {} # The value of each changed property before the algorithm started
+    # Produces steps until the step at index n exists. Returns False if the algorithm finishes before then
+    def HasStep(self,n):
+        while len(self.steps) <= n and not self.exhausted:
+            try:
+                self.steps.append(next(self.generator))
+            except StopIteration:
+                self.exhausted = True
+        return n < len(self.steps)
+    def __getitem__(self,n):
+        self.HasStep(n)
+        return self.steps[n]
+    # The number of steps produced so far
+    def __len__(self):
+        return len(self.steps)
+    # The total number of steps, which is only known for certain once the generator is exhausted
+    def CountText(self):
+        if self.exhausted:
+            return str(len(self.steps))
+        return f"≥ {len(self.steps)}"
+
+# Holds the costs shown on node labels while a SPA is visualised
+# Only costs changed by the algorithm's steps are stored, every other node has a default cost
+# This means a run can be started without visiting every node
+class SearchState:
+    def __init__(self,search,view):
+        self.search = search
+        self.view = view
+        self.values = {} # Maps (node id, attribute) onto costs changed by the algorithm's steps
+    def Get(self,node,attr):
+        key = (node.id,attr)
+        if key in self.values:
+            return self.values[key]
+        i = self.view.index[node.id]
+        # Heuristic costs are only calculated for nodes whose labels are shown
+        # The total cost of the start node is just its heuristic cost
+        if attr == "hCost" or (attr == "tCost" and i == self.search.start):
+            return self.search.HCost(i)
+        return math.inf
+    def Set(self,node,attr,value):
+        self.values[(node.id,attr)] = value
+
+# Returns a list of the nodes in the graph and a compact view of them, where node indices in the view refer to positions in the list
+# They are kept until the graph changes so starting a search on the same graph doesn't need to copy it again
+def GetView(sharedMemory):
+    if sharedMemory["View"] == None or sharedMemory["View"][0] != sharedMemory["GraphVersion"]:
+        nodes = list(sharedMemory["Nodes"])
+        sharedMemory["View"] = (sharedMemory["GraphVersion"],nodes,BuildView(nodes))
+    return sharedMemory["View"][1:]
+
 # A step which will explain why there is no route in SPAs
 class NoRoute(Step):
     def __init__(self,startNode,endNode):
@@ -21,17 +82,18 @@ class NoRoute(Step):
 
 # ~~~ DIJKSTRA ALGORITHM ~~~
 # A list of classes and a function used to generate a set of steps for a Dijkstra's Pathfinding Algorithm
+# The search itself is performed in solver.py and each of its events is turned into a step here
 
 
 # A step which will contain data to explain and visualise when a new node has been selected
 class NodeSelectDijkstra(Step):
-    def __init__(self, node,sharedMemory):
-        explanation = f"The algorithm looks at all unexplored nodes and selects {node.name} because it has the lowest cost of {node.cost}. This means this is the lowest cost possible to reach this node and so can be explored and marked green."
+    def __init__(self, node,cost,fromNode,sharedMemory):
+        explanation = f"The algorithm looks at all unexplored nodes and selects {node.name} because it has the lowest cost of {cost}. This means this is the lowest cost possible to reach this node and so can be explored and marked green."
         tempOps = [ChangeProperty(sharedMemory,False,object = node,attr = "selected", value = True) # Select the node of interest     
         ]
-        if node.GetEdgeTo(node.fromN):
+        if node.GetEdgeTo(fromNode):
             # Select the edge where the lowest cost came from     
-            tempOps.append(ChangeProperty(sharedMemory,False,object = node.GetEdgeTo(node.fromN),attr = "outlineColour", value = sharedMemory["SelectionColour"]))
+            tempOps.append(ChangeProperty(sharedMemory,False,object = node.GetEdgeTo(fromNode),attr = "outlineColour", value = sharedMemory["SelectionColour"]))
 
         # Make the node green indicating it has been explored
         permOps = [ChangeProperty(sharedMemory,False,object = node, attr = "colour", value = "#3ab733")] 
@@ -39,15 +101,15 @@ class NodeSelectDijkstra(Step):
 
 # A step which will explain when and where a new cost has been calculated for dijkstras
 class NodeCostDijkstra(Step):
-    def __init__(self, node, previousNode,oldCost,newCost,sharedMemory):
+    def __init__(self, node, previousNode,previousCost,oldCost,newCost,sharedMemory):
         edge = node.GetEdgeTo(previousNode)
         # Have a different explanation depending on if this is the first time the cost has been calculated
-        if node.cost == math.inf:
-            explanation = f"The algorithm considers {node} and marks it in yellow. To calculate the cost to reach this node it takes the cost of {previousNode} which is {previousNode.cost} and adds the weight of {edge} which is {edge.weight}. Therefore, the cost of {node} is {previousNode.cost}+{edge.weight} = {newCost}"
+        if oldCost == math.inf:
+            explanation = f"The algorithm considers {node} and marks it in yellow. To calculate the cost to reach this node it takes the cost of {previousNode} which is {previousCost} and adds the weight of {edge} which is {edge.weight}. Therefore, the cost of {node} is {previousCost}+{edge.weight} = {newCost}"
         else:
-            explanation = f"A shorter route has been found to reach {node} through {previousNode}. The new cost is therefore, {previousNode.cost} + {edge.weight} = {newCost}"
+            explanation = f"A shorter route has been found to reach {node} through {previousNode}. The new cost is therefore, {previousCost} + {edge.weight} = {newCost}"
         tempOps = [ChangeProperty(sharedMemory,False,object = node, attr = "selected", value = True), # Select the node of interest
-        ChangeProperty(sharedMemory,False,object = node.GetEdgeTo(node.fromN), attr = "selected", value = True) # Select the edge where the lowest cost came from
+        ChangeProperty(sharedMemory,False,object = edge, attr = "selected", value = True) # Select the edge where the lowest cost came from
         ]             
 
         permOps = [ChangeProperty(sharedMemory,False,object = node, attr = "colour", value = "#e0b818"), # Make the node yellow indicating it has been added to the unexplored
@@ -56,12 +118,12 @@ class NodeCostDijkstra(Step):
 
 # A step which will backtrack an edge to work out the shortest route
 class BacktrackDijkstra(Step):
-    def __init__(self,node,sharedMemory):
-        edge = node.GetEdgeTo(node.fromN)
-        explanation = f"By inspecting the graph, {node} must have come from {node.fromN} because the cost of {node}, {node.cost} subtract the weight of {edge}, {edge.weight} is equal to the cost of {node.fromN}, {node.fromN.cost}"
+    def __init__(self,node,fromNode,cost,fromCost,sharedMemory):
+        edge = node.GetEdgeTo(fromNode)
+        explanation = f"By inspecting the graph, {node} must have come from {fromNode} because the cost of {node}, {cost} subtract the weight of {edge}, {edge.weight} is equal to the cost of {fromNode}, {fromCost}"
         # Select the nodes and edges
         permOps = [ChangeProperty(sharedMemory,False,object = edge,attr = "outlineColour", value = sharedMemory["SelectionColour"]), 
-        ChangeProperty(sharedMemory,False,object = node.fromN,attr = "outlineColour", value = sharedMemory["SelectionColour"]),
+        ChangeProperty(sharedMemory,False,object = fromNode,attr = "outlineColour", value = sharedMemory["SelectionColour"]),
         ChangeProperty(sharedMemory,False,object = node,attr = "outlineColour", value = sharedMemory["SelectionColour"])
         ] 
         super().__init__(explanation, [], permOps)
@@ -77,9 +139,9 @@ class StartStepDijkstra(Step):
 
 # A step which states the final shortest route
 class StateRouteDijkstra(Step):
-    def __init__(self,startNode,endNode,route):
+    def __init__(self,startNode,endNode,route,cost):
         # This step only contains an explanation and does not change the graph.
-        super().__init__(f"The shortest path between {startNode} and {endNode} has now been calculated with a total cost of {endNode.cost} along the path:<br>{' --> '.join([repr(n) for n in route])}", [],[])
+        super().__init__(f"The shortest path between {startNode} and {endNode} has now been calculated with a total cost of {cost} along the path:<br>{' --> '.join([repr(n) for n in route])}", [],[])
 
 # This algorithm uses the afformentioned classes to create a set of steps for Dijkstra's
 def Dijkstra(sharedMemory,root):
@@ -94,71 +156,179 @@ def Dijkstra(sharedMemory,root):
     # Get the nodes from their ids
     startNode = NodeFromID(sharedMemory["SPAStartNode"],sharedMemory)
     endNode = NodeFromID(sharedMemory["SPAEndNode"],sharedMemory)
-    # Set/Reset some variables 
-    for node in sharedMemory["Nodes"]:
-        node.explored = False
-        node.selected = False
-        node.cost = math.inf
-        node.fromN = None
-        node.UpdateLabel(sharedMemory)
-    for edge in sharedMemory["Edges"]:
-        edge.selected = False
-    # Set up to begin searching for the shortest path
-    unexplored = [startNode]
-    startNode.cost = 0
-    endNodeReached = False
-    # An array which will store all steps in the algorithm
-    steps = [StartStepDijkstra(startNode,sharedMemory)]
-    #steps.append(StartStep(startNode,sharedMemory))
-    while unexplored != [] and not endNodeReached:
-        # Find the node with the lowest cost out of all unexplored nodes
-        bestNode = unexplored[0]
-        for node in unexplored:
-            if node.cost < bestNode.cost:
-                bestNode = node
-        # Mark the best node as explored
-        # The route to this node with the lowest cost has been found
-        bestNode.explored = True
-        unexplored.remove(bestNode)
-        # Add a step each time a node is selected
-        if startNode != bestNode:
-            steps.append(NodeSelectDijkstra(bestNode,sharedMemory))
-        # If the end node has been reached then the algorithm is complete
-        if bestNode == endNode:
-            endNodeReached = True
-            continue
-        # Add neighbouring, unexplored nodes and calculate the cost to reach these nodes
-        for node in bestNode.connectedNodes:
-            if node.explored:
-                continue
-            # Get the edge between this node and the best node
-            edge = node.GetEdgeTo(bestNode)
-            # Calculate the cost to reach this node
-            cost = bestNode.cost + edge.weight
-            # If the cost is a new best, the cost is updated and it is recorded where the route came from
-            if cost < node.cost:
-                node.fromN = bestNode
-                # Add a step each time a new cost is calculated / node is added to unexplored array
-                steps.append(NodeCostDijkstra(node,bestNode,node.cost,cost,sharedMemory))
-                node.cost = cost
-            # Add the node to the unexplored array if not already there
-            if node not in unexplored:
-                unexplored.append(node)
-    if not endNodeReached:
+    # Set up a search on a compact view of the graph
+    nodes,view = GetView(sharedMemory)
+    search = Search(view,view.index[startNode.id],view.index[endNode.id])
+    # Every node starts with an infinite cost, which is held by the run rather than set on each node
+    sharedMemory["SearchState"] = SearchState(search,view)
+    UpdateSelection(sharedMemory,[])
+    RefreshLabels(sharedMemory)
+    # Steps are produced as the user moves through the algorithm
+    sharedMemory["Step"] = 0
+    sharedMemory["Steps"] = StepBuffer(DijkstraSteps(sharedMemory,nodes,search),sharedMemory["CheckpointInterval"])
+
+# A generator which will yield each step for Dijkstra's as the search progresses
+def DijkstraSteps(sharedMemory,nodes,search):
+    startNode = nodes[search.start]
+    endNode = nodes[search.end]
+    yield StartStepDijkstra(startNode,sharedMemory)
+    for event in search.Events():
+        node = nodes[event[1]]
+        if event[0] == "Select":
+            # Add a step each time a node is selected
+            if startNode != node:
+                yield NodeSelectDijkstra(node,search.cost[event[1]],nodes[search.fromN[event[1]]],sharedMemory)
+        else:
+            # Add a step each time a new cost is calculated / node is added to the unexplored nodes
+            previous, oldCost, newCost = event[2::]
+            yield NodeCostDijkstra(node,nodes[previous],search.cost[previous],oldCost,newCost,sharedMemory)
+    if not search.reached:
         # Add a step explaining no route could be found
-        steps.append(NoRoute(startNode,endNode))
+        yield NoRoute(startNode,endNode)
     else:
-        route = [endNode]
+        path = search.Path()
         # Backtrack from the endNode to find out the shortest path
-        while route[-1].fromN != startNode:
-            steps.append(BacktrackDijkstra(route[-1],sharedMemory))
-            route.append(route[-1].fromN)
-            # Add a step for each step in the backtrack process
-        steps.append(BacktrackDijkstra(route[-1],sharedMemory))
-        route = [startNode]+route[::-1]
-        steps.append(StateRouteDijkstra(startNode,endNode,route))
+        # Add a step for each step in the backtrack process
+        for i in range(len(path)-1,0,-1):
+            yield BacktrackDijkstra(nodes[path[i]],nodes[path[i-1]],search.cost[path[i]],search.cost[path[i-1]],sharedMemory)
+        route = [nodes[i] for i in path]
+        yield StateRouteDijkstra(startNode,endNode,route,search.cost[search.end])
+
+
+# ~~~ BIDIRECTIONAL DIJKSTRA ALGORITHM ~~~
+# Two Dijkstra searches are run at once, one forward from the start node and one backward from the end node
+# The forward search marks nodes in yellow then green, and the backward search marks them in purple then blue
+
+# The colours, cost attributes and descriptions used by each direction of the search
+FRONTIER_COLOURS = ("#e0b818","#a45ee5")
+EXPLORED_COLOURS = ("#3ab733","#2f7fd6")
+COST_ATTRIBUTES = ("cost","bCost")
+DIRECTION_NAMES = ("forward","backward")
+
+# A step which will explain the first step in bidirectional dijkstra
+class StartStepBidirectional(Step):
+    def __init__(self,startNode,endNode,sharedMemory):
+        permOps = [ChangeProperty(sharedMemory,False,object = startNode, attr = "colour", value = EXPLORED_COLOURS[FORWARD]),
+        ChangeProperty(sharedMemory,False,object = startNode, attr = "cost",old = math.inf,value = 0),
+        ChangeProperty(sharedMemory,False,object = endNode, attr = "colour", value = EXPLORED_COLOURS[BACKWARD]),
+        ChangeProperty(sharedMemory,False,object = endNode, attr = "bCost",old = math.inf,value = 0)
+        ]
+        super().__init__(f"The program runs two searches at once. The forward search starts at {startNode} and marks it in green. The backward search starts at {endNode} and marks it in blue. Each node shows its cost from {startNode} followed by its cost to {endNode}.", [],permOps)
+
+# A step which will contain data to explain and visualise when one of the searches selects a new node
+class NodeSelectBidirectional(Step):
+    def __init__(self,node,direction,cost,fromNode,sharedMemory):
+        explanation = f"The {DIRECTION_NAMES[direction]} search has the lowest cost left, so it selects {node.name} which has a cost of {cost}. This is the lowest cost possible for this search to reach this node, so it is explored and marked {['green','blue'][direction]}."
+        tempOps = [ChangeProperty(sharedMemory,False,object = node,attr = "selected", value = True) # Select the node of interest
+        ]
+        if node.GetEdgeTo(fromNode):
+            # Select the edge where the lowest cost came from
+            tempOps.append(ChangeProperty(sharedMemory,False,object = node.GetEdgeTo(fromNode),attr = "outlineColour", value = sharedMemory["SelectionColour"]))
+        permOps = [ChangeProperty(sharedMemory,False,object = node, attr = "colour", value = EXPLORED_COLOURS[direction])]
+        super().__init__(explanation, tempOps, permOps)
+
+# A step which will explain when and where one of the searches has calculated a new cost
+class NodeCostBidirectional(Step):
+    def __init__(self,node,direction,previousNode,previousCost,oldCost,newCost,explored,sharedMemory):
+        edge = node.GetEdgeTo(previousNode)
+        # Have a different explanation depending on if this is the first time the cost has been calculated
+        if oldCost == math.inf:
+            explanation = f"The {DIRECTION_NAMES[direction]} search considers {node} and marks it in {['yellow','purple'][direction]}. Its cost is the cost of {previousNode}, {previousCost} add the weight of {edge}, {edge.weight}. Therefore, the cost of {node} is {previousCost}+{edge.weight} = {newCost}"
+        else:
+            explanation = f"The {DIRECTION_NAMES[direction]} search has found a shorter route to {node} through {previousNode}. The new cost is therefore, {previousCost} + {edge.weight} = {newCost}"
+        tempOps = [ChangeProperty(sharedMemory,False,object = node, attr = "selected", value = True), # Select the node of interest
+        ChangeProperty(sharedMemory,False,object = edge, attr = "selected", value = True) # Select the edge where the lowest cost came from
+        ]
+        permOps = [ChangeProperty(sharedMemory,False,object = node, attr = COST_ATTRIBUTES[direction],old = oldCost,value = newCost)] # Update the cost of the node
+        # Nodes already explored by the other search keep their colour
+        if not explored:
+            permOps.append(ChangeProperty(sharedMemory,False,object = node, attr = "colour", value = FRONTIER_COLOURS[direction]))
+        super().__init__(explanation, tempOps, permOps)
+
+# A step which will explain when a better route has been found through a node reached by both searches
+class MeetBidirectional(Step):
+    def __init__(self,node,forwardCost,backwardCost,sharedMemory):
+        explanation = f"{node} has now been reached by both searches. A route through it costs {forwardCost} + {backwardCost} = {forwardCost + backwardCost}, which is the best route found so far. The searches continue until they can show no shorter route exists."
+        tempOps = [ChangeProperty(sharedMemory,False,object = node, attr = "selected", value = True)]
+        super().__init__(explanation, tempOps, [])
+
+# A step which will explain why the searches can stop
+class StopBidirectional(Step):
+    def __init__(self,forwardCost,backwardCost,best):
+        super().__init__(f"The lowest costs left in the forward and backward searches are {forwardCost} and {backwardCost}. Any route through a node neither search has explored must cost at least {forwardCost} + {backwardCost} = {forwardCost + backwardCost}, which is no less than the best route found, {best}. Therefore, the best route found is the shortest and the searches stop.", [],[])
+
+# A step which will backtrack an edge to work out the shortest route
+# The forward search backtracks towards the start node and the backward search towards the end node
+class BacktrackBidirectional(Step):
+    def __init__(self,node,fromNode,direction,cost,fromCost,sharedMemory):
+        edge = node.GetEdgeTo(fromNode)
+        explanation = f"By inspecting the graph, the {DIRECTION_NAMES[direction]} search must have reached {node} from {fromNode} because the cost of {node}, {cost} subtract the weight of {edge}, {edge.weight} is equal to the cost of {fromNode}, {fromCost}"
+        # Select the nodes and edges
+        permOps = [ChangeProperty(sharedMemory,False,object = edge,attr = "outlineColour", value = sharedMemory["SelectionColour"]),
+        ChangeProperty(sharedMemory,False,object = fromNode,attr = "outlineColour", value = sharedMemory["SelectionColour"]),
+        ChangeProperty(sharedMemory,False,object = node,attr = "outlineColour", value = sharedMemory["SelectionColour"])
+        ]
+        super().__init__(explanation, [], permOps)
+
+# This algorithm uses the afformentioned classes to create a set of steps for bidirectional Dijkstra's
+def BidirectionalDijkstra(sharedMemory,root):
+    # Put the program into read-only mode
+    sharedMemory["SPA"] = "Bidirectional Dijkstra"
+    sharedMemory["SelectedTool"] = "#Move_Camera"
+    sharedMemory["Edit"] = False
+    GetElement(root,"#Toolbar").hide()
+    GetElement(root,"#Read_Only_Toolbar").show()
+    GetElement(root,"#Explantion_Window").show()
+
+    # Get the nodes from their ids
+    startNode = NodeFromID(sharedMemory["SPAStartNode"],sharedMemory)
+    endNode = NodeFromID(sharedMemory["SPAEndNode"],sharedMemory)
+    # Set up a search on a compact view of the graph
+    nodes,view = GetView(sharedMemory)
+    search = BidirectionalSearch(view,view.index[startNode.id],view.index[endNode.id])
+    # Every node starts with infinite costs from both ends, which are held by the run rather than set on each node
+    sharedMemory["SearchState"] = SearchState(search,view)
+    UpdateSelection(sharedMemory,[])
+    RefreshLabels(sharedMemory)
+    # Steps are produced as the user moves through the algorithm
     sharedMemory["Step"] = 0
-    sharedMemory["Steps"] = steps
+    sharedMemory["Steps"] = StepBuffer(BidirectionalDijkstraSteps(sharedMemory,nodes,search),sharedMemory["CheckpointInterval"])
+
+# A generator which will yield each step for bidirectional Dijkstra's as the searches progress
+def BidirectionalDijkstraSteps(sharedMemory,nodes,search):
+    startNode = nodes[search.start]
+    endNode = nodes[search.end]
+    yield StartStepBidirectional(startNode,endNode,sharedMemory)
+    for event in search.Events():
+        if event[0] == "Select":
+            direction, i = event[1::]
+            # Each search explored the node it started from in the first step
+            if i != [search.start,search.end][direction]:
+                yield NodeSelectBidirectional(nodes[i],direction,search.cost[direction][i],nodes[search.fromN[direction][i]],sharedMemory)
+        elif event[0] == "Cost":
+            direction, i, previous, oldCost, newCost = event[1::]
+            yield NodeCostBidirectional(nodes[i],direction,nodes[previous],search.cost[direction][previous],oldCost,newCost,i in search.explored[1 - direction],sharedMemory)
+        elif event[0] == "Meet":
+            i = event[1]
+            yield MeetBidirectional(nodes[i],search.cost[FORWARD][i],search.cost[BACKWARD][i],sharedMemory)
+        else:
+            yield StopBidirectional(event[1],event[2],search.best)
+    if not search.reached:
+        # Add a step explaining no route could be found
+        yield NoRoute(startNode,endNode)
+    else:
+        path = search.Path()
+        meet = path.index(search.meet)
+        # Backtrack from where the searches met to the start node, then to the end node
+        # Add a step for each step in the backtrack process
+        cost = search.cost[FORWARD]
+        for i in range(meet,0,-1):
+            yield BacktrackBidirectional(nodes[path[i]],nodes[path[i-1]],FORWARD,cost[path[i]],cost[path[i-1]],sharedMemory)
+        cost = search.cost[BACKWARD]
+        for i in range(meet,len(path)-1):
+            yield BacktrackBidirectional(nodes[path[i]],nodes[path[i+1]],BACKWARD,cost[path[i]],cost[path[i+1]],sharedMemory)
+        route = [nodes[i] for i in path]
+        yield StateRouteDijkstra(startNode,endNode,route,search.best)
 
 
 # ~~~ A* PATHFINDING  ALGORITHM ~~~
@@ -166,44 +336,44 @@ def Dijkstra(sharedMemory,root):
 
 
 class NodeCostAStar(Step):
-    def __init__(self, node, previousNode,oldCost,newCost,sharedMemory):
+    def __init__(self, node, previousNode,previousCost,oldCost,newCost,hCost,explored,sharedMemory):
         edge = node.GetEdgeTo(previousNode)
         # Have a different explanation depending on if this is the first time the cost has been calculated
-        if node.wCost == math.inf:
-            explanation = f"The algorithm considers {node} and marks it in yellow. To calculate the weighted cost to reach this node it takes the weighted cost of {previousNode} which is {previousNode.wCost} and adds the weight of {edge} which is {edge.weight}. Therefore, the weighted cost of {node} is {previousNode.wCost}+{edge.weight} = {newCost}. This weighted cost can be added to the heuristic cost of {node}, {node.hCost} to calculate the total cost of the node which is {node.hCost + newCost}"
+        if oldCost == math.inf:
+            explanation = f"The algorithm considers {node} and marks it in yellow. To calculate the weighted cost to reach this node it takes the weighted cost of {previousNode} which is {previousCost} and adds the weight of {edge} which is {edge.weight}. Therefore, the weighted cost of {node} is {previousCost}+{edge.weight} = {newCost}. This weighted cost can be added to the heuristic cost of {node}, {hCost} to calculate the total cost of the node which is {hCost + newCost}"
         else:
-            explanation = f"A shorter route has been found to reach {node} through {previousNode}. The new cost is therefore, {previousNode.wCost} + {edge.weight} = {newCost}"
+            explanation = f"A shorter route has been found to reach {node} through {previousNode}. The new cost is therefore, {previousCost} + {edge.weight} = {newCost}"
         tempOps = [ChangeProperty(sharedMemory,False,object = node, attr = "selected", value = True), # Select the node of interest
-        ChangeProperty(sharedMemory,False,object = node.GetEdgeTo(node.fromN), attr = "selected", value = True) # Select the edge where the lowest cost came from
+        ChangeProperty(sharedMemory,False,object = edge, attr = "selected", value = True) # Select the edge where the lowest cost came from
         ]             
             
-        permOps = [ChangeProperty(sharedMemory,False,object = node, attr = "colour", value = ["#e0b818","#3ab733"][node.explored]), # Make the node yellow indicating it has been added to the unexplored
+        permOps = [ChangeProperty(sharedMemory,False,object = node, attr = "colour", value = ["#e0b818","#3ab733"][explored]), # Make the node yellow indicating it has been added to the unexplored
         ChangeProperty(sharedMemory,False,object = node, attr = "wCost",old = oldCost,value = newCost), # Update the weighted cost of a node
-        ChangeProperty(sharedMemory,False,object = node, attr = "tCost",old = oldCost + node.hCost,value = newCost + node.hCost) # Update the total cost of a node
+        ChangeProperty(sharedMemory,False,object = node, attr = "tCost",old = oldCost + hCost,value = newCost + hCost) # Update the total cost of a node
         ] 
         super().__init__(explanation, tempOps, permOps)
 
 # A step which will contain data to explain and visualise when a new node has been selected
 class NodeSelectAStar(Step):
-    def __init__(self, node,sharedMemory):
-        explanation = f"The algorithm looks at all unexplored nodes and selects {node.name} because it has the lowest total cost of {node.tCost}. This means this is the lowest cost possible to reach this node and so can be explored and marked green."
+    def __init__(self, node,tCost,fromNode,sharedMemory):
+        explanation = f"The algorithm looks at all unexplored nodes and selects {node.name} because it has the lowest total cost of {tCost}. This means this is the lowest cost possible to reach this node and so can be explored and marked green."
         tempOps = [ChangeProperty(sharedMemory,False,object = node,attr = "selected", value = True) # Select the node of interest     
         ]
-        if node.GetEdgeTo(node.fromN):
+        if node.GetEdgeTo(fromNode):
             # Select the edge where the lowest cost came from     
-            tempOps.append(ChangeProperty(sharedMemory,False,object = node.GetEdgeTo(node.fromN),attr = "outlineColour", value = sharedMemory["SelectionColour"]))
+            tempOps.append(ChangeProperty(sharedMemory,False,object = node.GetEdgeTo(fromNode),attr = "outlineColour", value = sharedMemory["SelectionColour"]))
 
         permOps = [ChangeProperty(sharedMemory,False,object = node, attr = "colour", value = "#3ab733"),] # Make the node green indicating it has been explored
         super().__init__(explanation, tempOps, permOps)
 
 # A step which will backtrack an edge to work out the shortest route
 class BacktrackAStar(Step):
-    def __init__(self,node,sharedMemory):
-        edge = node.GetEdgeTo(node.fromN)
-        explanation = f"By inspecting the graph, {node} must have come from {node.fromN} because the weighted cost of {node}, {node.wCost} subtract the weight of {edge}, {edge.weight} is equal to the weighted cost of {node.fromN}, {node.fromN.wCost}"
+    def __init__(self,node,fromNode,wCost,fromWCost,sharedMemory):
+        edge = node.GetEdgeTo(fromNode)
+        explanation = f"By inspecting the graph, {node} must have come from {fromNode} because the weighted cost of {node}, {wCost} subtract the weight of {edge}, {edge.weight} is equal to the weighted cost of {fromNode}, {fromWCost}"
         # Select the nodes and edges
         permOps = [ChangeProperty(sharedMemory,False,object = edge,attr = "outlineColour", value = sharedMemory["SelectionColour"]), 
-        ChangeProperty(sharedMemory,False,object = node.fromN,attr = "outlineColour", value = sharedMemory["SelectionColour"]),
+        ChangeProperty(sharedMemory,False,object = fromNode,attr = "outlineColour", value = sharedMemory["SelectionColour"]),
         ChangeProperty(sharedMemory,False,object = node,attr = "outlineColour", value = sharedMemory["SelectionColour"])
         ] 
         super().__init__(explanation, [], permOps)
@@ -214,14 +384,17 @@ class StartStepAStar(Step):
         permOps = [ChangeProperty(sharedMemory,False,object = startNode, attr = "colour", value = "#3ab733"),
         ChangeProperty(sharedMemory,False,object = startNode, attr = "wCost",old = math.inf,value = 0)
         ]
-
-        super().__init__(f"The program starts at {startNode} and marks it in green. The heuristic cost for each node is also calculated. These represent the direct distance from the end node. Therefore, the higher the heuristic cost, the further away the node is.", [],permOps)
+        if sharedMemory["Heuristic"] == "Landmarks":
+            explanation = f"The program starts at {startNode} and marks it in green. The heuristic cost for each node is also calculated. Costs from a few landmark nodes to every node were worked out in advance. The difference between a landmark's cost to a node and its cost to the end node can never be more than the real cost between them, so the heuristic cost is the largest of these differences."
+        else:
+            explanation = f"The program starts at {startNode} and marks it in green. The heuristic cost for each node is also calculated. These represent the direct distance from the end node. Therefore, the higher the heuristic cost, the further away the node is."
+        super().__init__(explanation, [],permOps)
 
 # A step which states the final shortest route
 class StateRouteAStar(Step):
-    def __init__(self,startNode,endNode,route):
+    def __init__(self,startNode,endNode,route,tCost):
         # This step only contains an explanation and does not change the graph.
-        super().__init__(f"The shortest path between {startNode} and {endNode} has now been calculated with a total cost of {endNode.tCost} along the path:<br>{' --> '.join([repr(n) for n in route])}", [],[])
+        super().__init__(f"The shortest path between {startNode} and {endNode} has now been calculated with a total cost of {tCost} along the path:<br>{' --> '.join([repr(n) for n in route])}", [],[])
 
 # Creates a list of steps for A* 
 def AStar(sharedMemory,root):
@@ -236,72 +409,61 @@ def AStar(sharedMemory,root):
     # Get the nodes from their ids
     startNode = NodeFromID(sharedMemory["SPAStartNode"],sharedMemory)
     endNode = NodeFromID(sharedMemory["SPAEndNode"],sharedMemory)
-    # Set/Reset some variables 
-    for node in sharedMemory["Nodes"]:
-        node.explored = False
-        node.selected = False
-        # Total, weight and heuristic costs are used in this algorithm
-        node.tCost = math.inf
+    # Set up a search on a compact view of the graph
+    nodes,view = GetView(sharedMemory)
+    end = view.index[endNode.id]
+    if sharedMemory["Heuristic"] == "Landmarks":
+        # Heuristic cost is a lower bound worked out from the costs between landmark nodes and every node
+        heuristic = LandmarkHeuristic(GetLandmarks(sharedMemory,view),end)
+    else:
         # Heuristic cost is done by finding the direct length between nodes. This value is scaled to fit with other weights
-        node.hCost = int((node.position - endNode.position).magnitude() * (sharedMemory["HeuristicMultiplier"]))
-        node.wCost = math.inf
-        node.fromN = None
-        node.UpdateLabel(sharedMemory)
-    for edge in sharedMemory["Edges"]:
-        edge.selected = False
-    # Set up to begin searching for the shortest path
-    unexplored = [startNode]
-    startNode.wCost = 0
-    startNode.tCost = startNode.hCost
-    endNodeReached = False
-    # An array which will store all steps in the algorithm
-    steps = [StartStepAStar(startNode,sharedMemory)]
-    #steps.append(StartStep(startNode,sharedMemory))
-    while unexplored != [] and not endNodeReached:
-        # Find the node with the lowest total cost out of all unexplored nodes
-        bestNode = unexplored[0]
-        for node in unexplored:
-            if node.tCost < bestNode.tCost:
-                bestNode = node
-        # Mark the best node as explored
-        # The route to this node with the lowest cost has been found
-        bestNode.explored = True
-        unexplored.remove(bestNode)
-        # Add a step each time a node is selected
-        if startNode != bestNode:
-            steps.append(NodeSelectAStar(bestNode,sharedMemory))
-        # If the end node has been reached then the algorithm is complete
-        if bestNode == endNode:
-            endNodeReached = True
-            continue
-        # Add neighbouring, unexplored nodes and calculate the cost to reach these nodes
-        for node in bestNode.connectedNodes:
-            # Get the edge between this node and the best node
-            edge = node.GetEdgeTo(bestNode)
-            # Calculate the cost to reach this node
-            wCost = bestNode.wCost + edge.weight
-            # If the cost is a new best, the cost is updated and it is recorded where the route came from
-            if wCost < node.wCost:
-                node.fromN = bestNode
-                # Add a step each time a new weighted cost is calculated / node is added to unexplored array
-                steps.append(NodeCostAStar(node,bestNode,node.wCost,wCost,sharedMemory))
-                node.wCost = wCost
-                node.tCost = wCost + node.hCost
-            # Add the node to the unexplored array if not already there
-            if node not in unexplored and not node.explored:
-                unexplored.append(node)
-    if not endNodeReached:
+        heuristic = DistanceHeuristic(view,end,sharedMemory["HeuristicMultiplier"])
+    search = Search(view,view.index[startNode.id],end,heuristic)
+    # Total, weight and heuristic costs are used in this algorithm, which are held by the run rather than set on each node
+    sharedMemory["SearchState"] = SearchState(search,view)
+    UpdateSelection(sharedMemory,[])
+    RefreshLabels(sharedMemory)
+    # Steps are produced as the user moves through the algorithm
+    sharedMemory["Step"] = 0
+    sharedMemory["Steps"] = StepBuffer(AStarSteps(sharedMemory,nodes,search),sharedMemory["CheckpointInterval"])
+
+# Returns the landmark costs for a view of the graph
+# They are kept until the graph changes so repeated searches on the same graph don't need to work them out again
+def GetLandmarks(sharedMemory,view):
+    if sharedMemory["Landmarks"] == None or sharedMemory["Landmarks"][0] != sharedMemory["GraphVersion"]:
+        sharedMemory["Landmarks"] = (sharedMemory["GraphVersion"],Landmarks(view,sharedMemory["LandmarkCount"]))
+    return sharedMemory["Landmarks"][1]
+
+# Switches the heuristic used by A* between the direct distance to the end node and the landmark (ALT) heuristic
+# The button in the SPA properties shows which heuristic is in use
+def ToggleHeuristic(sharedMemory):
+    sharedMemory["Heuristic"] = ["Landmarks","Distance"][sharedMemory["Heuristic"] == "Landmarks"]
+    root = sharedMemory["MainUIManager"].get_root_container()
+    GetElement(root,"#Main_Window.#SPProperties.#Heuristic_Toggle").set_text(f"A* Heuristic: {sharedMemory['Heuristic']}")
+
+# A generator which will yield each step for A* as the search progresses
+def AStarSteps(sharedMemory,nodes,search):
+    startNode = nodes[search.start]
+    endNode = nodes[search.end]
+    yield StartStepAStar(startNode,sharedMemory)
+    for event in search.Events():
+        node = nodes[event[1]]
+        if event[0] == "Select":
+            # Add a step each time a node is selected
+            if startNode != node:
+                yield NodeSelectAStar(node,search.TCost(event[1]),nodes[search.fromN[event[1]]],sharedMemory)
+        else:
+            # Add a step each time a new weighted cost is calculated / node is added to the unexplored nodes
+            previous, oldCost, newCost = event[2::]
+            yield NodeCostAStar(node,nodes[previous],search.cost[previous],oldCost,newCost,search.HCost(event[1]),event[1] in search.explored,sharedMemory)
+    if not search.reached:
         # Add a step explaining no route could be found
-        steps.append(NoRoute(startNode,endNode))
+        yield NoRoute(startNode,endNode)
     else:
-        route = [endNode]
+        path = search.Path()
         # Backtrack from the endNode to find out the shortest path
-        while route[-1].fromN != startNode:
-            # Add a step for each step in the backtrack process
-            steps.append(BacktrackAStar(route[-1],sharedMemory))
-            route.append(route[-1].fromN)
-        steps.append(BacktrackAStar(route[-1],sharedMemory))
-        route = [startNode]+route[::-1]
-        steps.append(StateRouteAStar(startNode,endNode,route))
-    sharedMemory["Step"] = 0
-    sharedMemory["Steps"] = steps
\ No newline at end of file
+        # Add a step for each step in the backtrack process
+        for i in range(len(path)-1,0,-1):
+            yield BacktrackAStar(nodes[path[i]],nodes[path[i-1]],search.cost[path[i]],search.cost[path[i-1]],sharedMemory)
+        route = [nodes[i] for i in path]
+        yield StateRouteAStar(startNode,endNode,route,search.TCost(search.end))
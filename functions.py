@@ -10,6 +10,13 @@ import random
 import math
 import string
 
+# Properties of nodes and edges which are displayed on their labels
+LABEL_ATTRIBUTES = ["weight","name","cost","wCost","hCost","tCost","bCost"]
+# Properties of edges which change the shape of the graph rather than how it is displayed
+GRAPH_ATTRIBUTES = ["weight","length"]
+# Properties of nodes which only exist while a SPA is visualised
+# These are kept in sharedMemory["SearchState"] for the current run rather than on the nodes
+SEARCH_ATTRIBUTES = ["cost","wCost","hCost","tCost","bCost"]
 
 # ~~~ CORE FUNCTIONS ~~~
 # These functions are used to reduce repetitive calculations.
@@ -80,6 +87,20 @@ def EnvToScn(envPos,sharedMemory):
     
     return screenPos
 
+# Returns the scale and offset which convert environment positions to screen positions
+# A position (x,y) in the environment is at (x * scale + offsetX, offsetY - y * scale) on screen
+def CameraTransform(sharedMemory):
+    scale = sharedMemory["Scale"]
+    cameraPosition = sharedMemory["CameraPosition"]
+    screenSize = sharedMemory["ScreenSize"]
+    return scale,screenSize.x / 2 - cameraPosition.x * scale,screenSize.y / 2 + cameraPosition.y * scale
+
+# Converts the positions of many nodes to screen positions in one pass
+# Returns a dictionary mapping each node onto its (x,y) position on screen
+def ScreenPositions(nodes,sharedMemory):
+    scale,offsetX,offsetY = CameraTransform(sharedMemory)
+    return {node : (node.position.x * scale + offsetX,offsetY - node.position.y * scale) for node in nodes}
+
 # Function used to reference different UI elements from a parent element. For example, finding a button within the main window
 # Object Id path should be formatted as : "childId.childOfChildId" etc.
 def GetElement(container,objectIdPath):
@@ -124,6 +145,18 @@ def CheckHover(root,td):
 # These functions are used to get data from or manipulate data on graphs
 # Additional functions and classes are in the graph.py file
 
+# Returns the unit vector pointing along an offset between two nodes
+# If nodes are too close together, a random direction is used
+def NodeDirection(offset,distance):
+    if distance < 0.1:
+        dir = random.randint(-180,180) / 180
+        return Vector2(math.cos(dir * math.pi),math.sin(dir * math.pi))
+    return offset / distance
+
+# Returns the grid cell a position falls into for cells of a given size
+def GridCell(position,size):
+    return (math.floor(position.x / size),math.floor(position.y / size))
+
 # A function which will readujst all nodes in the environment
 # The maxforce and slope parameters are arbitrary constants
 # These determine the velocity and maximum values of the adjustment forces
@@ -134,74 +167,132 @@ def NodeReadjustment(sharedMemory,timedelta):
     nodes = sharedMemory["Nodes"]
     edges = sharedMemory["Edges"]
     lengthRatio = sharedMemory["LengthToUnitRatio"]
+    dragging = sharedMemory["Drag"]
+
+    # Sort the nodes into a grid of cells as wide as the optimal distance
+    # Repulsion only acts between nodes closer than the optimal distance, so only nodes in neighbouring cells need to be compared
+    cells = {}
+    for node in nodes:
+        cells.setdefault(GridCell(node.position,optimalDistance),[]).append(node)
 
     for node1 in nodes:
-        if node1.selected and sharedMemory["Drag"]:
+        if node1.selected and dragging:
             continue
-        for node2 in nodes:
-            if node1 == node2: # Ensure the nodes are unique
-                continue
-
-            # Calculate the distance between nodes
-            distance = (node2.position - node1.position).magnitude()
-            if distance < 0.1: # if nodes are too close together, a random direction is applied
-                dir = random.randint(-180,180) / 180
-                direction = Vector2(math.cos(dir * math.pi),math.sin(dir * math.pi))
-            else: 
-                direction = (node2.position - node1.position) / distance
-            
-            #If nodes are connected, an attractive force is applied
-            if node2 in node1.connectedNodes:
-                edge = node1.GetEdgeTo(node2)
-                force = 5 * maxForce * math.tanh(((distance-edge.length*lengthRatio)**3) / (slope**3))
-                node1.velocity += force * direction
-            #Nodes not connected by the other node will have a repulsive force applied if they are closer than optimal
-            elif distance < optimalDistance:
-                force = -maxForce * math.cos((math.pi * distance / (2*optimalDistance)))
-                node1.velocity += force * direction
+        cellX,cellY = GridCell(node1.position,optimalDistance)
+        for x in range(cellX-1,cellX+2):
+            for y in range(cellY-1,cellY+2):
+                for node2 in cells.get((x,y),[]):
+                    # Ensure the nodes are unique and not connected
+                    if node1 == node2 or node2 in node1.adjacency:
+                        continue
+                    offset = node2.position - node1.position
+                    distance = offset.magnitude()
+                    #Nodes not connected by the other node will have a repulsive force applied if they are closer than optimal
+                    if distance < optimalDistance:
+                        force = -maxForce * math.cos((math.pi * distance / (2*optimalDistance)))
+                        node1.velocity += force * NodeDirection(offset,distance)
+
+    #If nodes are connected, an attractive force is applied to both ends of the edge
+    for edge in edges:
+        offset = edge.nodeB.position - edge.nodeA.position
+        distance = offset.magnitude()
+        force = 5 * maxForce * math.tanh(((distance-edge.length*lengthRatio)**3) / (slope**3))
+        if not (edge.nodeA.selected and dragging):
+            edge.nodeA.velocity += force * NodeDirection(offset,distance)
+        if not (edge.nodeB.selected and dragging):
+            edge.nodeB.velocity -= force * NodeDirection(offset,distance)
     
     # Adjust node positions using their new velocities
     for node in nodes:
         #Time delta ensures the distance travelled is constant per second
         node.position += node.velocity * timedelta
         node.velocity = Vector2(0,0) # Reset the velocity
-        # Adjust the position of the node's labels
-        size = Vector2(node.UILabel.rect.size)
-        #The centre of the label should be updated to the centre of the node
-        position = EnvToScn(node.position,sharedMemory) - size / 2
-        node.UILabel.rect.x = position.x
-        node.UILabel.rect.y = position.y
-        text = GetElement(node.UILabel,"#Label_Text")
-        text.rect.x = position.x
-        text.rect.y = position.y
-
-    # Adjust the position of the weight labels
-    for edge in edges:
-        size = Vector2(edge.UILabel.rect.size)
-        #The centre of the label should be updated to the edge's midpoint
-        position = EnvToScn(edge.Mid(),sharedMemory) - size / 2
-        edge.UILabel.rect.x = position.x
-        edge.UILabel.rect.y = position.y
-        text = GetElement(edge.UILabel,"#Label_Text")
-        text.rect.x = position.x
-        text.rect.y = position.y
+    NodesMoved(sharedMemory)
+
+# Returns the area of the environment shown on screen as a pair of opposite corners
+# The area is widened slightly so objects and labels which are partly on screen are still included
+def ViewBounds(sharedMemory):
+    cornerA = ScnToEnv((0,0),sharedMemory)
+    cornerB = ScnToEnv(sharedMemory["ScreenSize"],sharedMemory)
+    # Labels stick out up to around 100 pixels from their centre, whatever the scale
+    margin = 60 + 100 / sharedMemory["Scale"]
+    low = (min(cornerA.x,cornerB.x) - margin,min(cornerA.y,cornerB.y) - margin)
+    high = (max(cornerA.x,cornerB.x) + margin,max(cornerA.y,cornerB.y) + margin)
+    return low,high
+
+# Returns the set of nodes and edges which could be on screen
+def VisibleObjects(sharedMemory):
+    return sharedMemory["SpatialIndex"].Query(*ViewBounds(sharedMemory))
+
+# Returns a dictionary mapping each node and edge onto its position in the list of nodes or edges, which is the order they are drawn in
+# It is kept until the graph changes, as the lists only change when nodes or edges are created or destroyed
+def DrawOrder(sharedMemory):
+    if sharedMemory["DrawOrder"] == None or sharedMemory["DrawOrder"][0] != sharedMemory["GraphVersion"]:
+        order = {node : i for i,node in enumerate(sharedMemory["Nodes"])}
+        order.update({edge : i for i,edge in enumerate(sharedMemory["Edges"])})
+        sharedMemory["DrawOrder"] = (sharedMemory["GraphVersion"],order)
+    return sharedMemory["DrawOrder"][1]
+
+# Returns the nodes and edges which may overlap an area of the environment
+# Each list is sorted in the order the objects are drawn, so the same object is picked whatever order the index finds them in
+def ObjectsInArea(sharedMemory,low,high):
+    found = sorted(sharedMemory["SpatialIndex"].Query(low,high),key=DrawOrder(sharedMemory).__getitem__)
+    nodes = [object for object in found if object.type == "Node"]
+    edges = [object for object in found if object.type == "Edge"]
+    return nodes,edges
+
+# Moves every node and edge into the correct cells of the spatial index
+def UpdateSpatialIndex(sharedMemory):
+    index = sharedMemory["SpatialIndex"]
+    for node in sharedMemory["Nodes"]:
+        index.Move(node,*node.Bounds())
+    for edge in sharedMemory["Edges"]:
+        index.Move(edge,*edge.Bounds())
+
+# Should be called whenever the layout moves nodes so the spatial index and background follow them
+def NodesMoved(sharedMemory):
+    UpdateSpatialIndex(sharedMemory)
+    SceneChanged(sharedMemory)
+
+# Should be called whenever a node or edge changes how it looks, so the background of the environment is redrawn
+def SceneChanged(sharedMemory):
+    sharedMemory["SceneVersion"] += 1
+
+# Should be called when the text of every label may have changed, such as when a SPA starts
+# Labels are only updated once they are next drawn, so labels off screen are never updated
+def RefreshLabels(sharedMemory):
+    sharedMemory["LabelVersion"] += 1
+    SceneChanged(sharedMemory)
+
+# Returns a property of a node or edge, including properties which are stored for the current SPA run
+def GetProperty(sharedMemory,object,attr):
+    if attr in SEARCH_ATTRIBUTES:
+        return sharedMemory["SearchState"].Get(object,attr)
+    return getattr(object,attr)
+
+# Sets a property of a node or edge, including properties which are stored for the current SPA run
+def SetProperty(sharedMemory,object,attr,value):
+    if attr in SEARCH_ATTRIBUTES:
+        sharedMemory["SearchState"].Set(object,attr,value)
+    else:
+        setattr(object,attr,value)
 
 # The following two functions will be used to locate an existing node based on a unique ID
 # This will be important for operations where object instances cannot be relied upon
 
 def NodeFromID(id,sharedMemory):
     # Return a node if an id is matched
-    for node in sharedMemory["Nodes"]:
-        if node.id == id:
-            return node
-    return None
+    return sharedMemory["NodeIndex"].get(id)
 
 def EdgeFromID(id,sharedMemory):
     # Return an edge if an id is matched
-    for edge in sharedMemory["Edges"]:
-        if edge.id == id:
-            return edge
-    return None
+    return sharedMemory["EdgeIndex"].get(id)
+
+# Returns a node or edge from its type ("Node"/"Edge") and unique ID
+def ObjectFromID(type,id,sharedMemory):
+    if type == "Node":
+        return NodeFromID(id,sharedMemory)
+    return EdgeFromID(id,sharedMemory)
 
 # ~~~ UI FUNCTIONS ~~~
 # A list of functions responsible for changing and updating the UI
@@ -369,22 +460,133 @@ def UpdateSlider(element,text):
     element.set_text(str(value))
     return value        
 
+# Updates the step counter, timeline and explanation text for the current step of a SPA
+# The total number of steps is shown as a lower bound until every step has been produced
+def UpdateExplanationWindow(sharedMemory,root):
+    steps = sharedMemory["Steps"]
+    stepN = sharedMemory["Step"]
+    # Look one step ahead so the last step is known as soon as it is reached
+    steps.HasStep(stepN+1)
+    window = GetElement(root,"#Explantion_Window")
+    # Update the step counter
+    GetElement(window,"#Step_Number").set_text(f"Step {stepN+1} of {steps.CountText()}")
+    # The timeline covers every step produced so far
+    timeline = GetElement(window,"#Step_Timeline")
+    timeline.value_range = (0,max(len(steps)-1,1))
+    timeline.set_current_value(stepN)
+    # Update the text
+    GetElement(window,"#Algorithm_Text").set_text(steps[stepN].explanation)
+
+# ~~~ STEP CHECKPOINTS ~~~
+# While a SPA is visualised, the state of the graph is recorded every few steps.
+# This allows the visualisation to jump to any step by restoring the closest checkpoint and replaying a few steps.
+
+# Sets each property in a dictionary of (type, id, attribute) keys to its new value
+# Each label is rebuilt at most once, no matter how many of its properties change
+def ApplyPending(sharedMemory,pending):
+    relabel = set()
+    updateProperties = False
+    for key in pending:
+        object = ObjectFromID(key[0],key[1],sharedMemory)
+        if GetProperty(sharedMemory,object,key[2]) == pending[key]:
+            continue
+        SetProperty(sharedMemory,object,key[2],pending[key])
+        if key[2] in GRAPH_ATTRIBUTES:
+            sharedMemory["GraphVersion"] += 1
+        if key[2] in LABEL_ATTRIBUTES:
+            relabel.add(object)
+        updateProperties = updateProperties or object in sharedMemory["Selected"]
+    for object in relabel:
+        object.UpdateLabel(sharedMemory)
+    if pending:
+        SceneChanged(sharedMemory)
+    if updateProperties:
+        UpdatePropertiesUI(sharedMemory)
+
+# Applies the permanent operations of steps first to last, recording the original value of any property changed for the first time
+# The operations are folded together so each property is only changed once
+# Any changes already in the pending dictionary are made first
+def ForwardSteps(sharedMemory,steps,first,last,pending = None):
+    if pending == None:
+        pending = {}
+    for stepN in range(first,last+1):
+        for perm in steps[stepN].permOps:
+            key = perm.Key()
+            if key not in steps.originals:
+                steps.originals[key] = GetProperty(sharedMemory,perm.Object(sharedMemory),key[2])
+            perm.Fold(sharedMemory,pending)
+        # Record a checkpoint of the graph every few steps
+        if stepN % steps.interval == 0 and stepN not in steps.checkpoints:
+            RecordCheckpoint(sharedMemory,steps,stepN,pending)
+    ApplyPending(sharedMemory,pending)
+
+# Records the value of every property changed so far by the algorithm's permanent operations
+# Values in the pending dictionary are used over those on the graph
+# This must be done while no temporary operations are applied
+def RecordCheckpoint(sharedMemory,steps,stepN,pending):
+    checkpoint = {}
+    for key in steps.originals:
+        if key in pending:
+            checkpoint[key] = pending[key]
+        else:
+            checkpoint[key] = GetProperty(sharedMemory,ObjectFromID(key[0],key[1],sharedMemory),key[2])
+    steps.checkpoints[stepN] = checkpoint
+    # If there are too many checkpoints, only every other one is kept and checkpoints are recorded half as often
+    if len(steps.checkpoints) > sharedMemory["MaxCheckpoints"]:
+        steps.interval *= 2
+        steps.checkpoints = {k : steps.checkpoints[k] for k in steps.checkpoints if k % steps.interval == 0}
+
+# Adds the changes needed to return the graph to a checkpoint to a dictionary of pending changes
+# A step number of -1 restores the graph to how it was before the algorithm started
+def RestoreCheckpoint(steps,stepN,pending):
+    checkpoint = steps.checkpoints.get(stepN,{})
+    for key in steps.originals:
+        # Properties changed for the first time after the checkpoint are set to their original value
+        pending[key] = checkpoint.get(key,steps.originals[key])
+
+# Moves the visualisation of a SPA directly to step n
+# The graph is restored from the closest checkpoint before step n so only a few steps need to be replayed
+def SeekStep(sharedMemory,root,n):
+    steps = sharedMemory["Steps"]
+    # Produce steps up to step n if they don't exist yet
+    steps.HasStep(n)
+    n = InBounds(n,(0,len(steps)-1))
+    current = sharedMemory["Step"]
+
+    # Undo the temporary operation of the current step
+    for temp in steps[current].tempOps:
+        temp.Backward(sharedMemory)
+
+    # Find the closest checkpoint at or before step n
+    start = max([k for k in steps.checkpoints if k <= n],default = -1)
+    pending = {}
+    # If the current step is between the checkpoint and step n, the graph can be moved on from the current step
+    if start <= current <= n:
+        start = current
+    else:
+        RestoreCheckpoint(steps,start,pending)
+    # Apply the permanent operations for every step after the starting point along with the restored checkpoint
+    ForwardSteps(sharedMemory,steps,start+1,n,pending)
+    sharedMemory["Step"] = n
+
+    UpdateExplanationWindow(sharedMemory,root)
+
+    # Apply the temporary operations for the new step
+    for temp in steps[n].tempOps:
+        temp.Forward(sharedMemory)
+
 # Updates the UI and graph for the algorithm visualisation of SPA
 def ApplyStep(sharedMemory,root,stepChange=0):
     # If the user tries to go out of the bounds of number of steps
     # No change should be made to the graph
     steps = sharedMemory["Steps"]
-    if (sharedMemory["Step"] == 0 and stepChange == -1) or (sharedMemory["Step"] == len(steps)-1 and stepChange == 1):
+    if (sharedMemory["Step"] == 0 and stepChange == -1) or (stepChange == 1 and not steps.HasStep(sharedMemory["Step"]+1)):
         return
-    window = GetElement(root,"#Explantion_Window")
     lastStep = steps[sharedMemory["Step"]]
     sharedMemory["Step"] += stepChange
     stepN = sharedMemory["Step"]
-    step = sharedMemory["Steps"][stepN]
-    # Update the step counter
-    GetElement(window,"#Step_Number").set_text(f"Step {stepN+1} of {len(steps)}")
-    # Update the text
-    GetElement(window,"#Algorithm_Text").set_text(steps[stepN].explanation)
+    step = steps[stepN]
+    UpdateExplanationWindow(sharedMemory,root)
 
     # If the step has changed, apply the backward operations for the last step's temporary operations
     if stepChange != 0:
@@ -399,8 +601,7 @@ def ApplyStep(sharedMemory,root,stepChange=0):
 
     # Apply the permanent operations of the current step when incrementing
     else:
-        for perm in step.permOps:
-            perm.Forward(sharedMemory)
+        ForwardSteps(sharedMemory,steps,stepN,stepN)
 
     # Apply the temporary operations for the current step
     for temp in step.tempOps:
@@ -408,52 +609,24 @@ def ApplyStep(sharedMemory,root,stepChange=0):
 
 # Complete all steps to the graph
 def SkipSteps(sharedMemory,root):
-    steps = sharedMemory["Steps"]
-
-    # Undo the temporary operation of the current step
-    for temp in steps[sharedMemory["Step"]].tempOps:
-        temp.Backward(sharedMemory)
-
-    while sharedMemory["Step"] < len(steps) - 1:
-        # Apply the permanent operations for every subsequent step
-        sharedMemory["Step"] += 1
-        for perm in steps[sharedMemory["Step"]].permOps:
-            perm.Forward(sharedMemory)
-    
-    window = GetElement(root,"#Explantion_Window")
-    # Update the step counter
-    GetElement(window,"#Step_Number").set_text(f"Step {sharedMemory['Step']+1} of {len(steps)}")
-    # Update the text
-    GetElement(window,"#Algorithm_Text").set_text(steps[sharedMemory['Step']].explanation)
-
-    # Apply the temporary operations for the final step
-    for temp in steps[sharedMemory["Step"]].tempOps:
-        temp.Forward(sharedMemory)
+    # Seeking to an infinite step will produce every remaining step and move to the final one
+    SeekStep(sharedMemory,root,math.inf)
 
 # Return back to the first step
 def RestartSteps(sharedMemory,root,full = False):
     steps = sharedMemory["Steps"]
-
-    # Undo the temporary operation of the current step
-    for temp in steps[sharedMemory["Step"]].tempOps:
-        temp.Backward(sharedMemory)
+    if not full:
+        SeekStep(sharedMemory,root,0)
+        return
 
     # If the full boolean is true, the first step is also undone (cleanup)
-    while sharedMemory["Step"]+full > 0:
-        # Undo the permanent operations for every previous step
-        for perm in steps[sharedMemory["Step"]].permOps:
-            perm.Backward(sharedMemory)
-        sharedMemory["Step"] -= 1
-    
-    window = GetElement(root,"#Explantion_Window")
-    # Update the step counter
-    GetElement(window,"#Step_Number").set_text(f"Step {sharedMemory['Step']+1} of {len(steps)}")
-    # Update the text
-    GetElement(window,"#Algorithm_Text").set_text(steps[sharedMemory['Step']].explanation)
-
-    # Apply the temporary operations for the first step
     for temp in steps[sharedMemory["Step"]].tempOps:
-        temp.Forward(sharedMemory)
+        temp.Backward(sharedMemory)
+    pending = {}
+    RestoreCheckpoint(steps,-1,pending)
+    ApplyPending(sharedMemory,pending)
+    # No step is applied to the graph
+    sharedMemory["Step"] = -1
 
 #Update algorithm parameters for SPAs
 def UpdateSPProperties(root,sharedMemory):
@@ -533,8 +706,12 @@ def Redo(sharedMemory):
 def Select(sharedMemory,position):
     #Convert the screen position to an environment position
     position = ScnToEnv(position,sharedMemory)
+    # Only objects near the position need to be checked
+    # The area checked is widened by the arbitrary value added to make selection easier
+    nodes,edges = ObjectsInArea(sharedMemory,(position.x - 20,position.y - 20),(position.x + 20,position.y + 20))
     # Check if a node was selected
-    for node in sharedMemory["Nodes"]:
+    # Nodes drawn later are drawn on top, so they are checked first
+    for node in reversed(nodes):
         distance = (position - node.position).magnitude()
         #If the distance is less than the radius of the node, the user clicked on the node
         # An arbitrary value is added to make it easier to select nodes
@@ -542,7 +719,7 @@ def Select(sharedMemory,position):
             return node
 
     # Check if an edge was selected
-    for edge in sharedMemory["Edges"]:
+    for edge in reversed(edges):
         # Get the normalised direction from one edge node to the other
         try:
             normal = (edge.nodeB.position - edge.nodeA.position).normalize()
@@ -574,12 +751,14 @@ def SelectArea(sharedMemory,startVector,endVector):
     #Find the bounds of the selection area
     xBounds,yBounds = GetBounds(startVector,endVector)
     selected = []
+    # Only objects overlapping the area need to be checked
+    nodes,edges = ObjectsInArea(sharedMemory,(xBounds[0],yBounds[0]),(xBounds[1],yBounds[1]))
     #Check for nodes that are inside the area
-    for node in sharedMemory["Nodes"]:
+    for node in nodes:
         pos = node.position
         if pos.x > xBounds[0] and pos.x < xBounds[1] and pos.y > yBounds[0] and pos.y < yBounds[1]:
             selected.append(node)
-    for edge in sharedMemory["Edges"]:
+    for edge in edges:
         pos = edge.Mid()
         if pos.x > xBounds[0] and pos.x < xBounds[1] and pos.y > yBounds[0] and pos.y < yBounds[1]:
             selected.append(edge)
@@ -598,6 +777,7 @@ def UpdateSelection(sharedMemory,selectionList):
         # Set the selected parameter in the object to true
         for item in sharedMemory["Selected"]:
             item.selected = True
+    SceneChanged(sharedMemory)
 
     UpdatePropertiesUI(sharedMemory)
 
@@ -1,7 +1,8 @@
 # This file contains code about creating graphs
 
-from functions import NameNode, GetElement, EnvToScn, NodeFromID, NewEnv, NodeFromID,UpdateSelection
-from gui import CreateLabel
+from functions import NameNode, NodeFromID, NewEnv, NodeFromID,UpdateSelection,SceneChanged
+from layout import InitialLayout
+from labels import Label
 import pygame
 from pygame.math import Vector2
 from pygame import Color
@@ -14,18 +15,21 @@ from tkinter import filedialog
 import os
 import pickle
 
+# The most node sprites which are cached before the cache is emptied
+MAX_NODE_SPRITES = 256
+
 # ~~~ GRAPH CLASSES ~~~
 
 # A datastructure used to represent a node
+# Attributes are stored in slots rather than a dictionary, which greatly reduces the memory used by large graphs
 class Node:
+    __slots__ = ("id","name","colour","outlineColour","position","velocity","radius","adjacency","selected","label")
+    type = "Node"
     def __init__(self,sharedMemory,position,name = None,colour = None,outColour = None,radius = 50,id = None):
         if colour == None:
             colour = sharedMemory["Defaults"]["NodeColour"]
         if type(name) != str: # Create a default node name
             name = NameNode(sharedMemory)
-        # Create a label which will display the name of this node
-        self.type = "Node"
-        
         # Assign a unique number to each node so they can be individually identified
         if id == None:
             id = sharedMemory["NodeCount"]
@@ -39,26 +43,42 @@ class Node:
         self.position = position
         self.velocity = Vector2(0,0)
         self.radius = radius
-        self.connectedEdges = []
-        self.connectedNodes = []
+        self.adjacency = {} # Maps each connected node onto the edge connecting it to this node
         self.selected = False
         sharedMemory["Nodes"].append(self) # Add the node to a list of nodes which can be accessed through shared memory
+        sharedMemory["NodeIndex"][self.id] = self # Allow the node to be found quickly from its id
+        sharedMemory["SpatialIndex"].Insert(self,*self.Bounds()) # Allow the node to be found quickly from its position
+        sharedMemory["GraphVersion"] += 1
 
         # Create a label
-        self.UpdateLabel(sharedMemory,False)
+        self.label = Label(sharedMemory["Labels"])
+        self.UpdateLabel(sharedMemory)
     # Appropriately removes a node from a graph
     def Destroy(self,sharedMemory):
-        #Delete the UI label
-        self.UILabel.kill()
+        self.label.Release()
         sharedMemory["Nodes"].remove(self)
+        sharedMemory["NodeIndex"].pop(self.id)
+        sharedMemory["SpatialIndex"].Remove(self)
+        sharedMemory["GraphVersion"] += 1
         # Delete all edges connected to this node
-        while len(self.connectedEdges):
-            self.connectedEdges[0].Destroy(sharedMemory)
+        for edge in list(self.connectedEdges):
+            edge.Destroy(sharedMemory)
+    # The nodes and edges connected to this node, in the order they were connected
+    @property
+    def connectedNodes(self):
+        return self.adjacency.keys()
+    @property
+    def connectedEdges(self):
+        return self.adjacency.values()
     def GetEdgeTo(self,node):
-        for edge in self.connectedEdges:
-            if edge.nodeA == node or edge.nodeB == node:
-                return edge
-        return None
+        return self.adjacency.get(node)
+    # Returns opposite corners of a box containing the node and its outline
+    def Bounds(self):
+        size = self.radius + 5
+        return (self.position.x - size,self.position.y - size),(self.position.x + size,self.position.y + size)
+    # Returns the position on screen this node's label is centred on, from the screen positions of nodes
+    def LabelPosition(self,positions):
+        return positions[self]
     def DragToward(self,position,sharedMemory):
         # Manual adjustment to the positon of a node
         # Works with the same forces as for the automatic adjustment for smoother results
@@ -71,35 +91,38 @@ class Node:
         force = 20 * maxForce * math.tanh(((distance)**3) / (slope**3))
         # Apply resultant velocity
         self.velocity = force * direction
-    def Draw(self,screen,sharedMemory):
-        # Draw a circle representing each node onto the screen
-        pos = EnvToScn(self.position,sharedMemory)
-        #Draw an outline around the circle where applicable
+    # Returns the sprite for this node and where it should be drawn on screen
+    # This can be passed to Surface.blits so many nodes can be drawn at once
+    # Positions is a dictionary mapping nodes onto their positions on screen, made by ScreenPositions
+    def Blit(self,sharedMemory,positions):
+        x,y = positions[self]
+        # Draw an outline around the circle where applicable
         outColour = self.outlineColour
         if self.selected:
             outColour = sharedMemory["SelectionColour"]
-        if outColour:
-            gfxdraw.filled_circle(screen, int(pos.x), int(pos.y), int((self.radius+5)*(sharedMemory["Scale"])), Color(outColour))
-            gfxdraw.aacircle(screen, int(pos.x), int(pos.y), int((self.radius+5)*(sharedMemory["Scale"])), Color(outColour))
-        gfxdraw.aacircle(screen, int(pos.x), int(pos.y), int((self.radius)*(sharedMemory["Scale"])), Color(self.colour))
-        gfxdraw.filled_circle(screen, int(pos.x), int(pos.y), int((self.radius)*(sharedMemory["Scale"])), Color(self.colour))
-    def UpdateLabel(self,sharedMemory,delete = True):
-        #Create a new label for this edge
-        self.manager = sharedMemory["EnvUIManager"]
-        nodeUI = GetElement(self.manager.get_root_container(),"#Node_UI") # Get the container where this label will be stored
-        
+        sprite = NodeSprite(sharedMemory,self.radius,self.colour,outColour)
+        size = sprite.get_width() // 2
+        return sprite,(int(x) - size,int(y) - size)
+    def UpdateLabel(self,sharedMemory):
+        # Update the text shown on this node's label, which is drawn by the label layer
+        # While a SPA is visualised, the costs of the node are taken from the current run
+        state = sharedMemory["SearchState"]
         if sharedMemory["SPA"] == "Dijkstra's Algorithm" and not sharedMemory["Edit"]:
             # Display the cost and name when performing dijkstra's algorithm
-            UILabel = CreateLabel(self.manager,nodeUI,(0,0),"Node_Label",height=65,text = f"{self.name}<br>{[str(self.cost),'∞'][self.cost == math.inf]}")
+            text = f"{self.name}<br>{CostText(state.Get(self,'cost'))}"
         elif sharedMemory["SPA"] == "A* Algorithm" and not sharedMemory["Edit"]:
             # Display the three cost variables when performing A*
-            UILabel = CreateLabel(self.manager,nodeUI,(0,0),"Node_Label",height=65,text = f"{self.name}<br>{[str(self.wCost),'∞'][self.wCost == math.inf]}, {self.hCost}, {[str(self.tCost),'∞'][self.tCost == math.inf]}")
+            text = f"{self.name}<br>{CostText(state.Get(self,'wCost'))}, {state.Get(self,'hCost')}, {CostText(state.Get(self,'tCost'))}"
+        elif sharedMemory["SPA"] == "Bidirectional Dijkstra" and not sharedMemory["Edit"]:
+            # Display the costs from the start and end nodes when performing bidirectional dijkstra's algorithm
+            text = f"{self.name}<br>{CostText(state.Get(self,'cost'))}, {CostText(state.Get(self,'bCost'))}"
         else:
             # Just display the name of the node
-            UILabel = CreateLabel(self.manager,nodeUI,(0,0),"Node_Label",text = str(self.name))
-        if delete:
-            self.UILabel.kill()
-        self.UILabel = UILabel
+            text = str(self.name)
+        self.label.version = sharedMemory["LabelVersion"]
+        # The background only needs to be redrawn if the text changed
+        if self.label.SetText(text):
+            SceneChanged(sharedMemory)
     # Compiles all data needed to rebuild this node
     def CompileData(self):
         return (self.position,self.name,self.colour,self.outlineColour,self.radius,self.id)
@@ -107,8 +130,40 @@ class Node:
     def __repr__(self):
         return self.name
 
+# Returns how a cost is written on a label
+def CostText(cost):
+    return ['∞',str(cost)][cost != math.inf]
+
+# Returns a surface with a circle representing a node drawn onto it at the current scale
+# Sprites are cached so each circle is only drawn once, rather than every frame for every node
+def NodeSprite(sharedMemory,radius,colour,outColour):
+    sprites = sharedMemory["NodeSprites"]
+    # Sprites drawn at a different scale are no longer needed
+    # The cache is also emptied when it gets too large, such as after the colours in use change many times
+    if sharedMemory["NodeSpriteScale"] != sharedMemory["Scale"] or len(sprites) > MAX_NODE_SPRITES:
+        sprites.clear()
+        sharedMemory["NodeSpriteScale"] = sharedMemory["Scale"]
+    key = (radius,colour,outColour)
+    if key in sprites:
+        return sprites[key]
+    innerRadius = int(radius * sharedMemory["Scale"])
+    outerRadius = innerRadius
+    if outColour:
+        outerRadius = int((radius+5) * sharedMemory["Scale"])
+    sprite = pygame.Surface((outerRadius*2 + 1,outerRadius*2 + 1),pygame.SRCALPHA)
+    #Draw an outline around the circle where applicable
+    if outColour:
+        gfxdraw.filled_circle(sprite, outerRadius, outerRadius, outerRadius, Color(outColour))
+        gfxdraw.aacircle(sprite, outerRadius, outerRadius, outerRadius, Color(outColour))
+    gfxdraw.aacircle(sprite, outerRadius, outerRadius, innerRadius, Color(colour))
+    gfxdraw.filled_circle(sprite, outerRadius, outerRadius, innerRadius, Color(colour))
+    sprites[key] = sprite
+    return sprite
+
 # Another datastructure to represent edges between nodes
 class Edge:
+    __slots__ = ("id","name","colour","outlineColour","nodeA","nodeB","weight","length","width","selected","label")
+    type = "Edge"
     def __init__(self,sharedMemory,nodeA,nodeB, colour = None,outColour = None, name = None, weight = None, length = None, width = 25,id = None):
         #Set defaults
         if colour == None:
@@ -120,7 +175,6 @@ class Edge:
         
         if type(name) != str: # Create a default edge name
             name = f"{nodeA.name} -- {nodeB.name}"
-        self.type = "Edge"
         if id == None:
             id = sharedMemory["EdgeCount"]
             sharedMemory["EdgeCount"] += 1
@@ -137,17 +191,29 @@ class Edge:
         self.selected = False
 
         # Create a label which will display the weight of this edge
-        self.UpdateLabel(sharedMemory,False)
+        self.label = Label(sharedMemory["Labels"])
+        self.UpdateLabel(sharedMemory)
 
-        # Add this edge to both node's list of connected edges and nodes.
-        nodeA.connectedEdges.append(self)
-        nodeA.connectedNodes.append(nodeB)
-        nodeB.connectedEdges.append(self)
-        nodeB.connectedNodes.append(nodeA)
+        # Connect both nodes to eachother through this edge
+        nodeA.adjacency[nodeB] = self
+        nodeB.adjacency[nodeA] = self
         # Add the node also to an array in shared memory
         sharedMemory["Edges"].append(self)
+        sharedMemory["EdgeIndex"][self.id] = self
+        sharedMemory["SpatialIndex"].Insert(self,*self.Bounds())
+        sharedMemory["GraphVersion"] += 1
     def Mid(self):
         return (self.nodeA.position + self.nodeB.position) / 2
+    # Returns opposite corners of a box containing the edge and its outline
+    def Bounds(self):
+        size = (self.width + 10) / 2
+        low = (min(self.nodeA.position.x,self.nodeB.position.x) - size,min(self.nodeA.position.y,self.nodeB.position.y) - size)
+        high = (max(self.nodeA.position.x,self.nodeB.position.x) + size,max(self.nodeA.position.y,self.nodeB.position.y) + size)
+        return low,high
+    # Returns the position on screen this edge's label is centred on, from the screen positions of nodes
+    def LabelPosition(self,positions):
+        (xA,yA),(xB,yB) = positions[self.nodeA],positions[self.nodeB]
+        return ((xA + xB) / 2,(yA + yB) / 2)
     def GetOtherNode(self,node):
         if node == self.nodeA:
             return self.nodeB
@@ -155,18 +221,19 @@ class Edge:
             return self.nodeA
         raise ValueError(f"{node} is not a node in the edge, {self}")
     def Destroy(self,sharedMemory):
-        # Delete UI label
-        self.UILabel.kill()
+        self.label.Release()
         # Remove the edge from all associated lists
-        self.nodeA.connectedEdges.remove(self)
-        self.nodeA.connectedNodes.remove(self.nodeB)
-        self.nodeB.connectedEdges.remove(self)
-        self.nodeB.connectedNodes.remove(self.nodeA)
+        self.nodeA.adjacency.pop(self.nodeB)
+        self.nodeB.adjacency.pop(self.nodeA)
         sharedMemory["Edges"].remove(self)
-    def Draw(self,screen,sharedMemory):
-        #Calculate the start and end positions of the edge onscreen
-        startPos = EnvToScn(self.nodeA.position,sharedMemory)
-        endPos =  EnvToScn(self.nodeB.position,sharedMemory)
+        sharedMemory["EdgeIndex"].pop(self.id)
+        sharedMemory["SpatialIndex"].Remove(self)
+        sharedMemory["GraphVersion"] += 1
+    # Positions is a dictionary mapping nodes onto their positions on screen, made by ScreenPositions
+    def Draw(self,screen,sharedMemory,positions):
+        #Get the start and end positions of the edge onscreen
+        startPos = positions[self.nodeA]
+        endPos = positions[self.nodeB]
         # Diplay an optional outline around nodes
         # This will be overwritten if the node is selected
         outColour = self.outlineColour
@@ -175,14 +242,11 @@ class Edge:
         if outColour:
             pygame.draw.line(screen,outColour,startPos,endPos,width = int((self.width+10) * sharedMemory["Scale"]))
         pygame.draw.line(screen,self.colour,startPos,endPos,width = int(self.width * sharedMemory["Scale"]))
-    def UpdateLabel(self,sharedMemory,delete = True):
-        #Create a new label for this edge
-        self.manager = sharedMemory["EnvUIManager"]
-        edgeUI = GetElement(self.manager.get_root_container(),"#Edge_UI") # Get the container where this label will be stored
-        UILabel = CreateLabel(self.manager,edgeUI,(0,0),"Edge_Label",text = str(self.weight))
-        if delete:
-            self.UILabel.kill()
-        self.UILabel = UILabel
+    def UpdateLabel(self,sharedMemory):
+        # Update the text shown on this edge's label, which is drawn by the label layer
+        self.label.version = sharedMemory["LabelVersion"]
+        if self.label.SetText(str(self.weight)):
+            SceneChanged(sharedMemory)
     # Compiles all data needed to rebuild this edge
     def CompileData(self):
         return (self.nodeA.id,self.nodeB.id,self.colour,self.outlineColour,self.name,self.weight,self.length,self.width,self.id)
@@ -239,7 +303,7 @@ def Open(sharedMemory):
     # If an invalid path is given
     if file == "" or not file.endswith(".grav"):
         # Abort successfully
-        return True
+        return True, 0
     
     # Unload data
     data = None
@@ -247,23 +311,39 @@ def Open(sharedMemory):
         data = pickle.load(open(file,"rb"))
     except Exception:
         # If the file could not be opened return False
-        return False
+        return False, 0
 
     #Reset the environment for the new graph
     NewEnv(sharedMemory)
+    merged = LoadGraph(sharedMemory,data)
+    # Set the save directory to this file
+    sharedMemory["SaveDir"] = file
+    return True, merged
+
+# Rebuilds the nodes and edges of a graph from the data saved in a file
+# Older files may connect the same two nodes more than once, only the edge with the lowest weight is kept so shortest paths are unchanged
+# Returns the number of edges which were left out
+def LoadGraph(sharedMemory,data):
     nodeData,edgeData, sharedMemory["NodeCount"], sharedMemory["EdgeCount"] = data
     # Rebuild nodes from their data
     for node in nodeData:
         Node(sharedMemory,*node)
-    # Rebuild edges from their data
-    for edge in edgeData:
+    # Find the lightest edge between each pair of nodes
+    # Maps each pair of node ids onto the position of its lightest edge in the edge data
+    lightest = {}
+    for i,edge in enumerate(edgeData):
+        pair = frozenset(edge[:2])
+        if pair not in lightest or edge[5] < edgeData[lightest[pair]][5]:
+            lightest[pair] = i
+    # Rebuild the kept edges from their data, in the order they were saved
+    for i in sorted(lightest.values()):
+        edge = edgeData[i]
         # Get the nodes from their ids
-        nodeA = NodeFromID(edge[0],sharedMemory)
-        nodeB = NodeFromID(edge[1],sharedMemory)
-        Edge(sharedMemory,nodeA,nodeB,*edge[2::])
-    # Set the save directory to this file
-    sharedMemory["SaveDir"] = file
-    return True
+        Edge(sharedMemory,NodeFromID(edge[0],sharedMemory),NodeFromID(edge[1],sharedMemory),*edge[2::])
+    # Graphs saved with every node in the same place are given a starting layout
+    if len(set((node.position.x,node.position.y) for node in sharedMemory["Nodes"])) == 1:
+        InitialLayout(sharedMemory)
+    return len(edgeData) - len(lightest)
 
 # ~~~ TEST FUNCTIONS ~~~
 
@@ -281,12 +361,14 @@ def GenerateGraph(sharedMemory,nodeCount,edgeCount):
         if n1 != n2 and nodes[n1] not in nodes[n2].connectedNodes:
             i += 1
             Edge(sharedMemory,nodes[n1],nodes[n2],weight=random.randint(5,30))
+    InitialLayout(sharedMemory,nodes)
             
 def GenerateKGraph(sharedMemory,n):
+    nodes = []
     for i in range(n):
-        Node(sharedMemory,Vector2(0,0))
-    for n1 in sharedMemory["Nodes"]:
-        for n2 in sharedMemory["Nodes"]:
-            if n1 == n2:
-                continue
-            Edge(sharedMemory,n1,n2,length = 100)
\ No newline at end of file
+        nodes.append(Node(sharedMemory,Vector2(0,0)))
+    # Connect each pair of nodes once
+    for i in range(len(nodes)):
+        for j in range(i+1,len(nodes)):
+            Edge(sharedMemory,nodes[i],nodes[j],length = 100)
+    InitialLayout(sharedMemory,nodes)
\ No newline at end of file
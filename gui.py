@@ -3,7 +3,7 @@
 import pygame
 import pygame_gui
 from pygame_gui.elements import UIPanel,UIButton,UITextEntryLine,UIHorizontalSlider,UILabel,UIImage,UITextBox,UISelectionList
-from pygame_gui.core import ObjectID, UIContainer
+from pygame_gui.core import ObjectID
 from pygame_gui.windows import UIConfirmationDialog
 from pygame.math import Vector2
 from functions import CreateUIElement
@@ -169,6 +169,9 @@ def CreateSPProperties(manager,mainWindow,winWidth,winHeight,navHeight,fieldHeig
                     object_id = ObjectID(object_id = "#Select_Label"),container = properties,text = "Select an algorithm:")
     CreateUIElement(manager,UISelectionList,(15,10+fieldHeight*4),(winWidth-30,35*len(algorithms)),TOP_LEFT,
                     object_id = ObjectID(object_id = "#SPA_Selection_List"),container = properties,item_list = algorithms)
+    # Switches the heuristic used by A* between distance and landmarks, which can also be done with Ctrl + H
+    CreateUIElement(manager,UIButton,(15,20+fieldHeight*4+35*len(algorithms)),(winWidth-30,fieldHeight),TOP_LEFT,
+                    object_id = ObjectID(object_id = "#Heuristic_Toggle"),container = properties,text="A* Heuristic: Distance")
 
     CreateUIElement(manager,UIButton,(15,10-fieldHeight),(winWidth-30,fieldHeight),BOTTOM_LEFT,
                     object_id = ObjectID(object_id = "#Start_Algorithm"),container = properties,text="Start")
@@ -194,7 +197,7 @@ def CreateHelp(manager,mainWindow,winWidth,winHeight,navHeight,fieldHeight,image
                     object_id = ObjectID(object_id = "#Next_Help",class_id = "@Button_Bar"),container = helpPanel,text="Next")
 
 # Create all sections of the main UI window
-def CreateMainWindow(manager,winWidth = 400,winHeight = 600,navHeight = 50,fieldHeight=40,algorithms = ["A* Algorithm","Dijkstra's Algorithm"],visible = True):
+def CreateMainWindow(manager,winWidth = 400,winHeight = 600,navHeight = 50,fieldHeight=40,algorithms = ["A* Algorithm","Dijkstra's Algorithm","Bidirectional Dijkstra"],visible = True):
     # The panel that represents the main window
     mainWindow = CreateUIElement(manager,UIPanel,(-20,75),(winWidth,winHeight),TOP_RIGHT,
                     starting_height = 1, object_id = ObjectID(object_id = "#Main_Window"),visible = visible)
@@ -226,8 +229,11 @@ def AlgorithmExplanation(manager,winWidth = 850,winHeight = 250,widgetSize = 50,
     #Explanation text will update depending on which step the user is on.
     explanationWindow = CreateUIElement(manager,UIPanel,(20,-20),(winWidth,winHeight),BOTTOM_LEFT,
                     starting_height = 1, object_id = ObjectID(object_id = "#Explantion_Window"),visible = visible)
-    CreateUIElement(manager,UITextBox,(15,widgetSize+15),(winWidth-30,winHeight-widgetSize-30),TOP_LEFT,
+    CreateUIElement(manager,UITextBox,(15,widgetSize+40),(winWidth-30,winHeight-widgetSize-55),TOP_LEFT,
                     object_id = ObjectID(object_id = "#Algorithm_Text",class_id = "@Button_Bar"),container = explanationWindow,html_text = "")
+    #A timeline which can be dragged to jump to any step
+    CreateUIElement(manager,UIHorizontalSlider,(15,widgetSize+10),(winWidth-30,20),TOP_LEFT,
+                    object_id = ObjectID(object_id = "#Step_Timeline"),container = explanationWindow,start_value = 0,value_range = (0,1))
     #This UI will allow the user to see their current step and move between them
     CreateUIElement(manager,UILabel,(winWidth / 2 - widgetSize * 2,0),(widgetSize*4,widgetSize),TOP_LEFT,
                         object_id = ObjectID(object_id = "#Step_Number"),container = explanationWindow,text="Step 999 of 1000")
@@ -296,16 +302,7 @@ def GenerateUI(screenSize):
     
     AlgorithmExplanation(mainUIManager)
 
-    # Another UI manager will also be created for labels associated with graphs
-    envUIManager = pygame_gui.UIManager(screenSize,"theme.json",True)
-
-    # Each panel will act as containers for all labels for edges and nodes
-    CreateUIElement(envUIManager,UIContainer,(0,0),screenSize,TOP_LEFT,
-                    object_id = ObjectID(object_id = "#Node_UI"))
-    CreateUIElement(envUIManager,UIContainer,(0,0),screenSize,TOP_LEFT,
-                    object_id = ObjectID(object_id = "#Edge_UI"))
-
     #Shows the FPS for performance testing
     FPS = CreateLabel(mainUIManager,mainUIManager.get_root_container(),(0,0),"#FPS",30, 100,TOP_RIGHT,"FPS: 0")
 
-    return screen,mainUIManager,envUIManager
\ No newline at end of file
+    return screen,mainUIManager
\ No newline at end of file
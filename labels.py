@@ -0,0 +1,129 @@
+# This file contains the label layer, which draws the labels of nodes and edges
+# The text of each label on screen is rendered once into a surface which is kept, so every label on screen can be drawn with a single Surface.blits call
+# Like the html text used by the rest of the UI, lines of a label are separated by "<br>"
+
+import pygame
+
+# The most line surfaces which are cached before the cache is emptied
+MAX_LINE_SURFACES = 4096
+# The most unused label surfaces of each size kept to be reused
+MAX_FREE_SURFACES = 64
+# How labels look, matching the "@Label" style in theme.json
+LABEL_FONT_SIZE = 18
+LABEL_TEXT_COLOUR = "#FFFFFF"
+LABEL_BG_COLOUR = "#15191e"
+LABEL_CORNER_RADIUS = 6
+# The space between the text and the edge of a label's background
+LABEL_PADDING = (10,5)
+
+# Renders and keeps track of the surfaces of every label
+# Labels showing the same text share one surface, which is kept for as long as any label shows that text
+# Once no label shows a text, its surface is kept in a pool and redrawn for the next new text of the same size
+class LabelLayer:
+    def __init__(self):
+        self.font = None # Loaded when first needed, as fonts can't be loaded before pygame is initialised
+        self.lines = {} # Maps each line of text onto its rendered surface
+        self.surfaces = {} # Maps the text of each label onto its rendered surface
+        self.users = {} # Maps the text of each label onto the number of labels showing it
+        self.free = {} # Maps a size onto unused surfaces of that size
+        self.drawn = set() # The labels drawn last time, which are the only labels holding a surface
+    # Returns the surface of a single line of text
+    def Line(self,text):
+        if text not in self.lines:
+            if self.font == None:
+                self.font = pygame.font.Font(None,LABEL_FONT_SIZE)
+            # The cache is emptied when it gets too large, such as after many steps of a SPA have changed the costs shown
+            if len(self.lines) > MAX_LINE_SURFACES:
+                self.lines.clear()
+            self.lines[text] = self.font.render(text,True,LABEL_TEXT_COLOUR)
+        return self.lines[text]
+    # Returns the surface of a label showing some text on top of a background, which ensures the text is always easy to read
+    # Each call should be matched by a call to Release once the label no longer shows the text
+    def Acquire(self,text):
+        if text in self.surfaces:
+            self.users[text] += 1
+            return self.surfaces[text]
+        lines = [self.Line(line) for line in text.split("<br>")]
+        width = max(line.get_width() for line in lines) + LABEL_PADDING[0] * 2
+        height = sum(line.get_height() for line in lines) + LABEL_PADDING[1] * 2
+        # Reuse an unused surface of the same size where possible
+        if self.free.get((width,height)):
+            surface = self.free[(width,height)].pop()
+            surface.fill((0,0,0,0))
+        else:
+            surface = pygame.Surface((width,height),pygame.SRCALPHA)
+        pygame.draw.rect(surface,LABEL_BG_COLOUR,surface.get_rect(),border_radius = LABEL_CORNER_RADIUS)
+        # Each line is centred horizontally
+        y = LABEL_PADDING[1]
+        for line in lines:
+            surface.blit(line,((width - line.get_width()) // 2,y))
+            y += line.get_height()
+        self.surfaces[text] = surface
+        self.users[text] = 1
+        return surface
+    # Called when a label stops showing some text
+    def Release(self,text):
+        self.users[text] -= 1
+        if self.users[text] > 0:
+            return
+        self.users.pop(text)
+        surface = self.surfaces.pop(text)
+        free = self.free.setdefault(surface.get_size(),[])
+        if len(free) < MAX_FREE_SURFACES:
+            free.append(surface)
+    # Draws the labels of a list of nodes and edges in one batch
+    # Node labels are centred on the node and edge labels on the edge's midpoint
+    # Positions is a dictionary mapping nodes onto their positions on screen, made by ScreenPositions
+    # Only labels being drawn hold a surface, so labels which are no longer drawn give theirs up
+    def Draw(self,surface,objects,positions,sharedMemory):
+        blits = []
+        drawn = set()
+        version = sharedMemory["LabelVersion"]
+        for object in objects:
+            label = object.label
+            # Labels are brought up to date when they are drawn after RefreshLabels is called
+            if label.version != version:
+                object.UpdateLabel(sharedMemory)
+            if label.surface == None:
+                label.surface = self.Acquire(label.text)
+            drawn.add(label)
+            x,y = object.LabelPosition(positions)
+            blits.append((label.surface,(int(x) - label.surface.get_width() // 2,int(y) - label.surface.get_height() // 2)))
+        surface.blits(blits,doreturn = False)
+        for label in self.drawn - drawn:
+            label.Hide()
+        self.drawn = drawn
+    # Called when no labels are drawn, so every label gives up its surface
+    def Hide(self):
+        for label in self.drawn:
+            label.Hide()
+        self.drawn = set()
+
+# The label of a node or edge
+# Only its text is kept until it is drawn, so labels off screen don't hold a surface
+# Its text is changed in place, and nothing is redrawn unless the text actually changes
+class Label:
+    __slots__ = ("layer","text","surface","version")
+    def __init__(self,layer):
+        self.layer = layer
+        self.text = None
+        self.surface = None # The surface showing the text, while the label is drawn
+        self.version = None # The label version the text was last updated for
+    # Changes the text shown on the label, returning whether it changed
+    def SetText(self,text):
+        if text == self.text:
+            return False
+        # The surface for the new text is found when the label is next drawn
+        self.Hide()
+        self.text = text
+        return True
+    # Gives up the label's surface, so it can be reused
+    def Hide(self):
+        if self.surface != None:
+            self.layer.Release(self.text)
+            self.surface = None
+    # Stops showing the label
+    def Release(self):
+        self.Hide()
+        self.layer.drawn.discard(self)
+        self.text = None
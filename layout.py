@@ -0,0 +1,624 @@
+# This file contains the layout engine which moves nodes into position
+# NumPy is used where it is installed so forces for every node can be calculated at once
+# Without NumPy, or when the layout mode is set to "Python", NodeReadjustment in functions.py is used instead
+# In "Worker" mode the NumPy layout runs on a separate thread so it doesn't hold up the mainloop
+
+from functions import NodeReadjustment, NodesMoved, SceneChanged
+from pygame.math import Vector2
+import math
+import threading
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The most pairs of nodes which will be compared at once
+# Larger groups are split up so that memory use stays bounded when many nodes are close together
+PAIR_CHUNK = 1000000
+# The multilevel initial layout merges nodes until graphs are no bigger than this
+COARSEST_SIZE = 20
+# The number of layout iterations run on the coarsest graph, and the most run on each finer graph after it
+COARSEST_ITERATIONS = 300
+LEVEL_ITERATIONS = 30
+# Larger graphs are given fewer iterations, so that each level takes about as long as a graph of this many nodes
+# Nodes of these graphs start close to where they settle, so the interactive layout quickly finishes them off
+LEVEL_NODE_BUDGET = 10000
+MIN_LEVEL_ITERATIONS = 3
+# The strength of Barnes-Hut long-range repulsion compared to MaxForce
+LONG_RANGE_STRENGTH = 0.05
+# The most levels the Barnes-Hut quadtree is split into
+MAX_TREE_DEPTH = 10
+# The layout modes in the order Ctrl + L switches through them
+LAYOUT_MODES = ["NumPy","Worker","Python"]
+# The most layout iterations the worker will run per second
+WORKER_RATE = 60
+# The longest time a single layout iteration of the worker can move nodes for, in seconds
+MAX_TIMEDELTA = 0.1
+
+# Adjusts the positions of all nodes in the environment using the selected layout mode
+# The layout sleeps once nodes have moved little on average over a number of frames, then nodes are no longer adjusted
+def Readjust(sharedMemory,timedelta):
+    if ActiveLayoutMode(sharedMemory) == "Worker":
+        if type(sharedMemory["Layout"]) != LayoutWorker:
+            sharedMemory["Layout"] = LayoutWorker(sharedMemory)
+        sharedMemory["Layout"].Update(sharedMemory)
+        return
+    # Wake the layout when the graph changes or a node is dragged
+    if sharedMemory["LayoutVersion"] != sharedMemory["GraphVersion"] or sharedMemory["Drag"]:
+        WakeLayout(sharedMemory)
+    if sharedMemory["LayoutAsleep"]:
+        return
+    if ActiveLayoutMode(sharedMemory) == "NumPy":
+        if type(sharedMemory["Layout"]) != LayoutEngine:
+            sharedMemory["Layout"] = LayoutEngine()
+        sharedMemory["Layout"].Step(sharedMemory,timedelta)
+    else:
+        NodeReadjustment(sharedMemory,timedelta)
+
+    # Nodes are only compared with where they were a number of frames ago, rather than checking their speed each frame
+    # This is because some nodes shake back and forth around where they settle without ever slowing down
+    if sharedMemory["LayoutAnchor"] is None:
+        sharedMemory["LayoutAnchor"] = NodePositions(sharedMemory)
+        sharedMemory["LayoutFrames"] = 0
+        return
+    sharedMemory["LayoutFrames"] += 1
+    if sharedMemory["LayoutFrames"] >= sharedMemory["SleepFrames"]:
+        positions = NodePositions(sharedMemory)
+        if Drift(sharedMemory["LayoutAnchor"],positions) < sharedMemory["SleepDistance"]:
+            sharedMemory["LayoutAsleep"] = True
+        sharedMemory["LayoutAnchor"] = positions
+        sharedMemory["LayoutFrames"] = 0
+
+# Makes the layout start adjusting nodes again
+def WakeLayout(sharedMemory):
+    sharedMemory["LayoutAsleep"] = False
+    sharedMemory["LayoutAnchor"] = None
+    sharedMemory["LayoutVersion"] = sharedMemory["GraphVersion"]
+    if type(sharedMemory["Layout"]) == LayoutWorker:
+        sharedMemory["Layout"].Wake()
+
+# Turns Barnes-Hut long-range repulsion on or off
+# Long-range repulsion is only calculated with NumPy, so this returns False and changes nothing when the "Python" layout is in use
+def ToggleLongRangeForces(sharedMemory):
+    if ActiveLayoutMode(sharedMemory) == "Python":
+        return False
+    sharedMemory["LongRangeForces"] = not sharedMemory["LongRangeForces"]
+    WakeLayout(sharedMemory)
+    return True
+
+# Returns a copy of the position of every node
+def NodePositions(sharedMemory):
+    if ActiveLayoutMode(sharedMemory) == "NumPy":
+        return sharedMemory["Layout"].positions.copy()
+    return [(node.position.x,node.position.y) for node in sharedMemory["Nodes"]]
+
+# Returns the root mean square distance nodes have moved between two copies of node positions
+# Large graphs always have a few nodes shuffling around, so the furthest any node moved would keep them awake
+def Drift(anchor,positions):
+    if len(anchor) != len(positions):
+        return math.inf
+    if len(positions) == 0:
+        return 0
+    if type(positions) == list:
+        return math.sqrt(sum(math.dist(a,b)**2 for a,b in zip(anchor,positions)) / len(positions))
+    offsets = positions - anchor
+    return math.sqrt(float((offsets**2).sum()) / len(positions))
+
+# Returns the layout mode in use, every mode other than "Python" needs NumPy
+def ActiveLayoutMode(sharedMemory):
+    if numpy == None:
+        return "Python"
+    return sharedMemory["LayoutMode"]
+
+# Switches to the next layout mode
+def ToggleLayoutMode(sharedMemory):
+    sharedMemory["LayoutMode"] = LAYOUT_MODES[(LAYOUT_MODES.index(sharedMemory["LayoutMode"]) + 1) % len(LAYOUT_MODES)]
+    if type(sharedMemory["Layout"]) == LayoutWorker:
+        sharedMemory["Layout"].Stop()
+    # The layout must reload node positions which were moved while it wasn't in use
+    sharedMemory["Layout"] = None
+    WakeLayout(sharedMemory)
+
+# ~~~ INITIAL LAYOUT ~~~
+
+# Gives every node a starting position so large graphs don't start piled on top of eachother
+# The graph is repeatedly coarsened by merging pairs of connected nodes, the smallest graph is laid out,
+# then each finer graph starts with its nodes placed around the node they were merged into and is adjusted from there
+# Without NumPy, nodes are spread out in a spiral instead
+# Only the given nodes are moved, which is every node by default
+def InitialLayout(sharedMemory,nodes = None):
+    if nodes == None:
+        nodes = sharedMemory["Nodes"]
+    if len(nodes) < 2:
+        return
+    if numpy == None:
+        SpiralLayout(sharedMemory,nodes)
+        return
+    index = {node : i for i,node in enumerate(nodes)}
+    edges = [edge for edge in sharedMemory["Edges"] if edge.nodeA in index and edge.nodeB in index]
+    levels = [(
+        len(nodes),
+        numpy.array([index[edge.nodeA] for edge in edges],dtype = numpy.int64),
+        numpy.array([index[edge.nodeB] for edge in edges],dtype = numpy.int64),
+        numpy.array([edge.length for edge in edges],dtype = float)
+    )]
+    parents = []
+    # Coarsen the graph until it is small enough or can't be made much smaller
+    while levels[-1][0] > COARSEST_SIZE:
+        n,edgeA,edgeB,lengths = levels[-1]
+        parent,m = MatchNodes(n,edgeA,edgeB)
+        if m > 0.9 * n:
+            break
+        # Edges between merged nodes are combined, with their lengths averaged
+        a = parent[edgeA]
+        b = parent[edgeB]
+        keep = a != b
+        keys,inverse = numpy.unique(numpy.minimum(a,b)[keep] * m + numpy.maximum(a,b)[keep],return_inverse = True)
+        coarseLengths = numpy.bincount(inverse,lengths[keep]) / numpy.bincount(inverse)
+        parents.append(parent)
+        levels.append((m,keys // m,keys % m,coarseLengths))
+
+    # Lay out the coarsest graph from random positions
+    optimalDistance = sharedMemory["OptimalNodeDistance"]
+    n = levels[-1][0]
+    scale = math.sqrt(len(nodes) / n)
+    positions = (numpy.random.rand(n,2) - 0.5) * optimalDistance * scale * math.sqrt(n)
+    positions = LayoutLevel(sharedMemory,positions,levels[-1],scale,COARSEST_ITERATIONS)
+    # Refine the layout one level at a time
+    for level in range(len(levels) - 2,-1,-1):
+        n = levels[level][0]
+        scale = math.sqrt(len(nodes) / n)
+        positions = positions[parents[level]] + (numpy.random.rand(n,2) - 0.5) * optimalDistance * scale * 0.5
+        iterations = max(MIN_LEVEL_ITERATIONS,min(LEVEL_ITERATIONS,LEVEL_NODE_BUDGET // n))
+        positions = LayoutLevel(sharedMemory,positions,levels[level],scale,iterations)
+
+    for node,(x,y) in zip(nodes,positions.tolist()):
+        node.position.update(x,y)
+    NodesMoved(sharedMemory)
+    # Layout engines must reload the new positions
+    sharedMemory["GraphVersion"] += 1
+
+# Pairs up nodes joined by an edge, returning which merged node each node belongs to and the number of merged nodes
+# Nodes left over join a neighbour's pair, and nodes without any edges are paired with eachother
+def MatchNodes(n,edgeA,edgeB):
+    parent = [-1] * n
+    m = 0
+    order = numpy.random.permutation(len(edgeA))
+    edges = list(zip(edgeA[order].tolist(),edgeB[order].tolist()))
+    for a,b in edges:
+        if parent[a] == -1 and parent[b] == -1:
+            parent[a] = m
+            parent[b] = m
+            m += 1
+    # Every neighbour of a node left over must already be paired
+    for a,b in edges:
+        if parent[a] == -1:
+            parent[a] = parent[b]
+        elif parent[b] == -1:
+            parent[b] = parent[a]
+    loner = None
+    for i in range(n):
+        if parent[i] != -1:
+            continue
+        if loner == None:
+            loner = i
+            continue
+        parent[loner] = m
+        parent[i] = m
+        loner = None
+        m += 1
+    if loner != None:
+        parent[loner] = m
+        m += 1
+    return numpy.array(parent,dtype = numpy.int64),m
+
+# Adjusts one level of the multilevel layout
+# Coarser levels are scaled up so the nodes merged into each node have room once they are separated again
+def LayoutLevel(sharedMemory,positions,level,scale,iterations):
+    n,edgeA,edgeB,lengths = level
+    engine = LayoutEngine()
+    engine.Load(positions,edgeA,edgeB,lengths)
+    parameters = {
+        "MaxForce" : sharedMemory["MaxForce"] * scale,
+        "AdjustmentRate" : sharedMemory["AdjustmentRate"] * scale,
+        "OptimalNodeDistance" : sharedMemory["OptimalNodeDistance"] * scale,
+        "LengthToUnitRatio" : sharedMemory["LengthToUnitRatio"] * scale,
+        "LongRangeForces" : sharedMemory["LongRangeForces"],
+        "BarnesHutTheta" : sharedMemory["BarnesHutTheta"]
+    }
+    for i in range(iterations):
+        engine.Advance(parameters,1 / 60,{})
+    return engine.positions
+
+# Places nodes along a spiral with roughly the optimal distance between neighbouring nodes
+def SpiralLayout(sharedMemory,nodes):
+    spacing = sharedMemory["OptimalNodeDistance"] * 0.6
+    for i,node in enumerate(nodes):
+        # Each node is turned by the golden angle so nodes are spread evenly
+        angle = i * math.pi * (3 - math.sqrt(5))
+        node.position.update(spacing * math.sqrt(i) * math.cos(angle),spacing * math.sqrt(i) * math.sin(angle))
+    NodesMoved(sharedMemory)
+    sharedMemory["GraphVersion"] += 1
+
+# Returns unit vectors for an array of offsets from nodes i to nodes j
+# If nodes are too close together, a direction is made up from the pair of nodes instead
+# The same pair is always given the same direction, reversed when the nodes are the other way round,
+# so the repulsion taken away for connected nodes cancels out the repulsion added for them
+def Directions(offsets,distances,i,j):
+    directions = offsets / numpy.maximum(distances,0.1)[:,None]
+    close = distances < 0.1
+    if close.any():
+        i = i[close]
+        j = j[close]
+        angle = (numpy.minimum(i,j) * 7919 + numpy.maximum(i,j) * 104729) % 360 * numpy.pi / 180
+        sign = numpy.where(i < j,1,-1)[:,None]
+        directions[close] = sign * numpy.stack((numpy.cos(angle),numpy.sin(angle)),axis = 1)
+    return directions
+
+# Returns the repulsive forces on the first node of each pair from the second node, for pairs of nodes closer than the optimal distance
+# The indices of the nodes in those pairs are returned as well
+def Repulsion(positions,i,j,maxForce,optimalDistance):
+    offsets = positions[j] - positions[i]
+    distances = numpy.hypot(offsets[:,0],offsets[:,1])
+    close = distances < optimalDistance
+    offsets = offsets[close]
+    distances = distances[close]
+    forces = -maxForce * numpy.cos(numpy.pi * distances / (2*optimalDistance))
+    i = i[close]
+    j = j[close]
+    directions = Directions(offsets,distances,i,j)
+    return forces * directions[:,0],forces * directions[:,1],i,j
+
+# ~~~ BARNES-HUT ~~~
+
+# Returns the long-range repulsion on every node from every other node
+# Nodes repel eachother with a force which falls off with the square of their distance beyond the optimal distance
+# Space is split into a quadtree, and groups of nodes which are far away compared to their size are treated as one node at their centre of mass
+# Theta is the largest ratio of group size to distance for which this is done, smaller values are slower but more accurate
+def LongRangeForces(positions,maxForce,optimalDistance,theta):
+    n = len(positions)
+    forceX = numpy.zeros(n)
+    forceY = numpy.zeros(n)
+    if n < 2:
+        return forceX,forceY
+    x = positions[:,0]
+    y = positions[:,1]
+    low = positions.min(axis = 0)
+    size = max(float((positions.max(axis = 0) - low).max()),optimalDistance) * 1.001
+    # Stop splitting the tree once cells are about as small as the optimal distance
+    depth = max(1,min(MAX_TREE_DEPTH,math.ceil(math.log2(size / optimalDistance))))
+
+    # Find the number of nodes and their centre of mass in every cell of every level of the tree
+    cellX = []
+    cellY = []
+    mass = []
+    massX = []
+    massY = []
+    for level in range(depth + 1):
+        cells = 2**level
+        cellX.append(numpy.minimum(((x - low[0]) / size * cells).astype(numpy.int64),cells - 1))
+        cellY.append(numpy.minimum(((y - low[1]) / size * cells).astype(numpy.int64),cells - 1))
+        keys = cellX[level] * cells + cellY[level]
+        mass.append(numpy.bincount(keys,minlength = cells**2))
+        massX.append(numpy.bincount(keys,x,cells**2))
+        massY.append(numpy.bincount(keys,y,cells**2))
+
+    # Every node starts by looking at the root of the tree
+    node = numpy.arange(n)
+    cx = numpy.zeros(n,dtype = numpy.int64)
+    cy = numpy.zeros(n,dtype = numpy.int64)
+    for level in range(depth + 1):
+        cells = 2**level
+        keys = cx * cells + cy
+        m = mass[level][keys]
+        offsetX = massX[level][keys] / m - x[node]
+        offsetY = massY[level][keys] / m - y[node]
+        distances = numpy.hypot(offsetX,offsetY)
+        # Cells far enough away are treated as one node
+        # The cell a node is in is never far enough away, as the node would be pushed by itself
+        inside = (cellX[level][node] == cx) & (cellY[level][node] == cy)
+        accept = ~inside & (size / cells < theta * distances)
+        forces = -LONG_RANGE_STRENGTH * maxForce * m[accept] * numpy.minimum(1,(optimalDistance / distances[accept])**2)
+        forceX += numpy.bincount(node[accept],forces * offsetX[accept] / distances[accept],n)
+        forceY += numpy.bincount(node[accept],forces * offsetY[accept] / distances[accept],n)
+        node = node[~accept]
+        cx = cx[~accept]
+        cy = cy[~accept]
+        if level == depth:
+            break
+        # The rest are opened up and their non-empty children are looked at on the next level
+        count = len(node)
+        node = numpy.repeat(node,4)
+        cx = numpy.repeat(cx * 2,4) + numpy.tile([0,0,1,1],count)
+        cy = numpy.repeat(cy * 2,4) + numpy.tile([0,1,0,1],count)
+        children = mass[level + 1][cx * cells * 2 + cy] > 0
+        node = node[children]
+        cx = cx[children]
+        cy = cy[children]
+
+    # Cells on the last level which are still too close to be treated as one node are split into the nodes in them
+    # The force from each of those nodes is found exactly, in groups of no more than PAIR_CHUNK pairs
+    cells = 2**depth
+    leafKeys = cellX[depth] * cells + cellY[depth]
+    order = numpy.argsort(leafKeys,kind = "stable")
+    keys = cx * cells + cy
+    starts = numpy.searchsorted(leafKeys[order],keys)
+    counts = mass[depth][keys]
+    totals = numpy.cumsum(counts)
+    first = 0
+    while first < len(keys):
+        last = max(int(numpy.searchsorted(totals,totals[first] - counts[first] + PAIR_CHUNK,"right")),first + 1)
+        groupCounts = counts[first:last]
+        total = int(groupCounts.sum())
+        offsets = numpy.repeat(starts[first:last] - (numpy.cumsum(groupCounts) - groupCounts),groupCounts)
+        i = numpy.repeat(node[first:last],groupCounts)
+        j = order[offsets + numpy.arange(total)]
+        offsetX = x[j] - x[i]
+        offsetY = y[j] - y[i]
+        distances = numpy.hypot(offsetX,offsetY)
+        # Leave out each node paired with itself, and nodes too close together to have a direction between them
+        apply = (i != j) & (distances > 0.1)
+        forces = -LONG_RANGE_STRENGTH * maxForce * numpy.minimum(1,(optimalDistance / distances[apply])**2)
+        forceX += numpy.bincount(i[apply],forces * offsetX[apply] / distances[apply],n)
+        forceY += numpy.bincount(i[apply],forces * offsetY[apply] / distances[apply],n)
+        first = last
+    return forceX,forceY
+
+# Calculates the same forces as NodeReadjustment, but with arrays of positions and edges
+# The arrays are only rebuilt when nodes or edges are created, destroyed or changed
+class LayoutEngine:
+    def __init__(self):
+        self.version = None
+    # Copies the graph into arrays
+    def Build(self,sharedMemory):
+        self.nodes = list(sharedMemory["Nodes"])
+        self.index = {node : i for i,node in enumerate(self.nodes)}
+        index = self.index
+        n = len(self.nodes)
+        edges = sharedMemory["Edges"]
+        # Every node followed by every edge, along with how far each one's bounding box reaches past its nodes' positions
+        self.objects = self.nodes + list(edges)
+        self.reach = numpy.array([node.radius + 5 for node in self.nodes] + [(edge.width + 10) / 2 for edge in edges],dtype = float)[:,None]
+        self.cells = None # The cells of the spatial index each object was last stored in
+        self.Load(
+            numpy.array([(node.position.x,node.position.y) for node in self.nodes],dtype = float).reshape(n,2),
+            numpy.array([index[edge.nodeA] for edge in edges],dtype = numpy.int64),
+            numpy.array([index[edge.nodeB] for edge in edges],dtype = numpy.int64),
+            numpy.array([edge.length for edge in edges],dtype = float)
+        )
+        self.version = sharedMemory["GraphVersion"]
+    # Uses arrays of node positions and edges, where each edge is given by the indices of the nodes it connects
+    def Load(self,positions,edgeA,edgeB,lengths):
+        n = len(positions)
+        self.positions = positions
+        self.edgeA = edgeA
+        self.edgeB = edgeB
+        self.lengths = lengths
+        # Each pair of connected nodes once, used to take them out of repulsion
+        keys = numpy.unique(numpy.minimum(edgeA,edgeB) * n + numpy.maximum(edgeA,edgeB))
+        self.pairA = keys // max(n,1)
+        self.pairB = keys % max(n,1)
+    # Returns a dictionary of the velocities given to nodes being dragged by the user
+    # Keys are node indices, and these nodes are not moved by the adjustment forces
+    def Drags(self,sharedMemory):
+        drags = {}
+        if sharedMemory["Drag"]:
+            for node in sharedMemory["Selected"]:
+                if node in self.index:
+                    drags[self.index[node]] = (node.velocity.x,node.velocity.y)
+                    node.velocity = Vector2(0,0)
+        return drags
+    # Returns the indices of every pair of nodes in the same or neighbouring cells of a grid as wide as the optimal distance
+    # Each pair is only given once, and pairs are produced in groups so no more than PAIR_CHUNK are held at once
+    def NeighbourPairs(self,optimalDistance):
+        n = len(self.positions)
+        cells = numpy.floor(self.positions / optimalDistance).astype(numpy.int64)
+        # Shift the cells so that all neighbouring cells have positive coordinates, then give each cell a unique key
+        cells -= cells.min(axis = 0) - 1
+        width = cells[:,1].max() + 2
+        keys = cells[:,0] * width + cells[:,1]
+        order = numpy.argsort(keys,kind = "stable")
+        sortedKeys = keys[order]
+        # Find where each node's own cell and the 4 neighbouring cells ahead of it are found in the sorted nodes
+        # The other 4 neighbouring cells are covered when those cells look ahead
+        rows = numpy.tile(numpy.arange(n),5)
+        neighbours = numpy.concatenate([(cells[:,0] + x) * width + cells[:,1] + y for x,y in ((0,0),(0,1),(1,-1),(1,0),(1,1))])
+        starts = numpy.searchsorted(sortedKeys,neighbours,"left")
+        counts = numpy.searchsorted(sortedKeys,neighbours,"right") - starts
+        totals = numpy.cumsum(counts)
+        first = 0
+        while first < len(rows):
+            # Take as many rows as fit into one group, but always at least one
+            last = max(int(numpy.searchsorted(totals,totals[first] - counts[first] + PAIR_CHUNK,"right")),first + 1)
+            rowCounts = counts[first:last]
+            size = int(rowCounts.sum())
+            if size:
+                # Expand each row into one pair for every node found in its cell
+                offsets = numpy.repeat(starts[first:last] - (numpy.cumsum(rowCounts) - rowCounts),rowCounts)
+                i = numpy.repeat(rows[first:last],rowCounts)
+                j = order[offsets + numpy.arange(size)]
+                # Pairs within the same cell are found from both nodes, so only one is kept
+                keep = (i < j) | numpy.repeat(numpy.arange(first,last) >= n,rowCounts)
+                yield i[keep],j[keep]
+            first = last
+    # Adjusts the positions of all nodes and updates the nodes to match
+    def Step(self,sharedMemory,timedelta):
+        if self.version != sharedMemory["GraphVersion"]:
+            self.Build(sharedMemory)
+        self.Advance(sharedMemory,timedelta,self.Drags(sharedMemory))
+        self.MoveNodes(sharedMemory,self.positions)
+    # Moves the nodes to an array of positions
+    # The range of cells each node and edge covers in the spatial index is found for every object at once,
+    # so only objects which moved into different cells are moved in the index
+    def MoveNodes(self,sharedMemory,positions):
+        for node,(x,y) in zip(self.nodes,positions.tolist()):
+            node.position.update(x,y)
+        a = positions[self.edgeA]
+        b = positions[self.edgeB]
+        low = numpy.concatenate((positions,numpy.minimum(a,b))) - self.reach
+        high = numpy.concatenate((positions,numpy.maximum(a,b))) + self.reach
+        cells = numpy.floor(numpy.hstack((low,high)) / sharedMemory["SpatialIndex"].cellSize)
+        if self.cells is None:
+            moved = range(len(self.objects))
+        else:
+            moved = numpy.flatnonzero((cells != self.cells).any(axis = 1)).tolist()
+        self.cells = cells
+        index = sharedMemory["SpatialIndex"]
+        for i in moved:
+            index.Move(self.objects[i],*self.objects[i].Bounds())
+        SceneChanged(sharedMemory)
+    # Adjusts the positions in the arrays without touching any nodes
+    def Advance(self,sharedMemory,timedelta,drags):
+        maxForce = sharedMemory["MaxForce"]
+        slope = sharedMemory["AdjustmentRate"]
+        optimalDistance = sharedMemory["OptimalNodeDistance"]
+        lengthRatio = sharedMemory["LengthToUnitRatio"]
+        n = len(self.positions)
+        if n == 0:
+            return
+        positions = self.positions
+        velX = numpy.zeros(n)
+        velY = numpy.zeros(n)
+
+        # Nodes will have a repulsive force applied if they are closer than optimal
+        for i,j in self.NeighbourPairs(optimalDistance):
+            forceX,forceY,i,j = Repulsion(positions,i,j,maxForce,optimalDistance)
+            # The force pushes both nodes of the pair apart
+            velX += numpy.bincount(i,forceX,n) - numpy.bincount(j,forceX,n)
+            velY += numpy.bincount(i,forceY,n) - numpy.bincount(j,forceY,n)
+        # Nodes connected by an edge don't repel eachother, so the repulsion added between them is taken away again
+        # This is much quicker than looking for connected nodes among every pair of nearby nodes
+        if len(self.pairA):
+            forceX,forceY,i,j = Repulsion(positions,self.pairA,self.pairB,maxForce,optimalDistance)
+            velX -= numpy.bincount(i,forceX,n) - numpy.bincount(j,forceX,n)
+            velY -= numpy.bincount(i,forceY,n) - numpy.bincount(j,forceY,n)
+
+        # Optional long-range repulsion between every pair of nodes
+        if sharedMemory["LongRangeForces"]:
+            forceX,forceY = LongRangeForces(positions,maxForce,optimalDistance,sharedMemory["BarnesHutTheta"])
+            velX += forceX
+            velY += forceY
+
+        #If nodes are connected, an attractive force is applied to both ends of the edge
+        if len(self.edgeA):
+            offsets = positions[self.edgeB] - positions[self.edgeA]
+            distances = numpy.hypot(offsets[:,0],offsets[:,1])
+            forces = 5 * maxForce * numpy.tanh(((distances - self.lengths * lengthRatio)**3) / (slope**3))
+            directions = Directions(offsets,distances,self.edgeA,self.edgeB)
+            forceX = forces * directions[:,0]
+            forceY = forces * directions[:,1]
+            velX += numpy.bincount(self.edgeA,forceX,n) - numpy.bincount(self.edgeB,forceX,n)
+            velY += numpy.bincount(self.edgeA,forceY,n) - numpy.bincount(self.edgeB,forceY,n)
+
+        # Dragged nodes aren't moved by the adjustment forces, and keep the velocity given to them by DragToward instead
+        for i in drags:
+            velX[i] = drags[i][0]
+            velY[i] = drags[i][1]
+
+        # Adjust node positions using their new velocities
+        #Time delta ensures the distance travelled is constant per second
+        positions[:,0] += velX * timedelta
+        positions[:,1] += velY * timedelta
+
+# Runs the NumPy layout on a separate thread
+# The worker works on its own copy of the graph, which is replaced whenever the graph changes
+# Positions are published through two buffers: the worker fills the back buffer then swaps it with the front buffer, which the mainloop reads from
+class LayoutWorker:
+    def __init__(self,sharedMemory):
+        self.lock = threading.Lock() # Must be held to access anything shared between the threads
+        self.awake = threading.Event() # Cleared while the layout is asleep
+        self.woken = False # True when the layout was woken up after the worker's current iteration started
+        self.stopped = False
+        self.version = None # The graph version of the latest copy sent to the worker
+        self.engine = None # The latest copy of the graph sent to the worker
+        self.next = None # A copy of the graph waiting to be picked up by the worker
+        self.drags = {} # Velocities of dragged nodes, forwarded from the mainloop
+        self.front = None
+        self.back = None
+        self.published = None # The copy of the graph the front buffer holds positions for
+        self.fresh = False # True when the front buffer has positions the mainloop hasn't read yet
+        self.thread = threading.Thread(target = self.Run,args = (sharedMemory,),daemon = True)
+        self.thread.start()
+    # Called each frame by the mainloop to exchange data with the worker
+    def Update(self,sharedMemory):
+        # Send a new copy of the graph to the worker whenever the graph changes
+        if self.version != sharedMemory["GraphVersion"]:
+            self.engine = LayoutEngine()
+            self.engine.Build(sharedMemory)
+            self.version = sharedMemory["GraphVersion"]
+            with self.lock:
+                self.next = self.engine
+            self.awake.set()
+        # Forward the velocities of dragged nodes
+        drags = self.engine.Drags(sharedMemory)
+        with self.lock:
+            self.drags = drags
+        if drags:
+            self.awake.set()
+        # Swap in the newest positions, unless they are for an older copy of the graph
+        positions = None
+        with self.lock:
+            if self.fresh and self.published == self.engine:
+                positions = self.front.copy()
+            self.fresh = False
+        if positions is not None:
+            self.engine.MoveNodes(sharedMemory,positions)
+    # Wakes the layout up, even if the worker has just decided to sleep
+    def Wake(self):
+        with self.lock:
+            self.woken = True
+        self.awake.set()
+    # Stops the worker thread after its current iteration and waits for it to finish
+    def Stop(self):
+        self.stopped = True
+        self.awake.set()
+        self.thread.join()
+    # The loop run by the worker thread
+    def Run(self,sharedMemory):
+        engine = None
+        last = time.perf_counter()
+        while sharedMemory["Run"] and not self.stopped:
+            # Wait while the layout is asleep, checking regularly if the program has closed
+            if not self.awake.wait(0.25):
+                continue
+            start = time.perf_counter()
+            timedelta = min(start - last,MAX_TIMEDELTA)
+            last = start
+            with self.lock:
+                # Pick up a new copy of the graph
+                if self.next != None:
+                    engine = self.next
+                    self.next = None
+                    self.front = numpy.empty_like(engine.positions)
+                    self.back = numpy.empty_like(engine.positions)
+                    anchor = None
+                drags = self.drags
+                self.woken = False
+            if engine == None:
+                continue
+            engine.Advance(sharedMemory,timedelta,drags)
+            # Publish the new positions
+            numpy.copyto(self.back,engine.positions)
+            with self.lock:
+                self.front,self.back = self.back,self.front
+                self.published = engine
+                self.fresh = True
+            # Sleep once nodes have moved little over a number of iterations, in the same way as Readjust
+            if anchor is None:
+                anchor = engine.positions.copy()
+                frames = 0
+            else:
+                frames += 1
+                if frames >= sharedMemory["SleepFrames"]:
+                    if Drift(anchor,engine.positions) < sharedMemory["SleepDistance"] and drags == {}:
+                        # The mainloop may have sent a new copy of the graph, dragged nodes or woken the layout since this iteration started
+                        # Only sleep if it hasn't, otherwise the wake up it sent would be lost
+                        with self.lock:
+                            if self.next == None and self.drags == {} and not self.woken:
+                                self.awake.clear()
+                    anchor = engine.positions.copy()
+                    frames = 0
+            # Limit how often the layout is iterated
+            time.sleep(max(0,1 / WORKER_RATE - (time.perf_counter() - start)))
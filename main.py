@@ -1,8 +1,10 @@
 from gui import *
 from operations import ChangeProperty, CreateEdgeOperation, CreateNodeOperation, Delete
 from functions import *
-from algorithm import AStar, Dijkstra
+from algorithm import AStar, Dijkstra, BidirectionalDijkstra, ToggleHeuristic
 from graph import Node, Edge, Save, Open
+from layout import Readjust, ToggleLayoutMode, ToggleLongRangeForces
+from memory import CreateSharedMemory
 import webbrowser
 
 if __name__ == "__main__":
@@ -16,55 +18,14 @@ if __name__ == "__main__":
     bgColour = (210, 210, 210)  # Set the rgb background colour of the environment
 
     # Initialise a dictionary containing parameters which can be easily shared between functions
-    sharedMemory = {
-        "Run": True,  # This boolean will determine when all threads should close
-        "CameraPosition": Vector2(0, 0),  # Represents the user's position in the environment
-        "ScaleBounds": (0.3, 1.6),  # The scale of the environment must be contained to these bounds
-        "Scale": scaleBounds[0],  # The scale in the environment view
-        "ScreenSize": Vector2(pygame.display.get_desktop_sizes()[0]) - Vector2(0, 80),  # The size of the screen
-        "MousePosition": Vector2(0, 0),  # Contains where the mouse currently is on screen
-        "MouseMovement": Vector2(0, 0),  # Contains the relative movement of the mouse
-        "SelectedTool": "#Select",  # The tool that should be used when the left click button is pressed
-        "Selected": [],  # Represents the currently selected object
-        "SelectionColour": "#00d0f9",  # The outline colour of selected nodes/edges
-        "SaveDir": None,  # The default location used to save files
-        "Changed": False,  # The graph has not been saved in this state
-        "Drag": False,  # Denotes if the selected object should be dragged
-        "UndoStack": [],  # A collection of operations that can be undone
-        "RedoStack": [],  # A collection of operations that can be redone
-        "Nodes": [],  # Contains all nodes in the environment
-        "Edges": [],  # Contains all edges in the environment
-        "LengthToUnitRatio": 25,  # One unit of length in an edge represents 25 units in the environment
-        "MaxForce": 500,  # Maximum force which can be applied to nodes
-        "AdjustmentRate": 200,  # The rate at which nodes connected by an edge move to reach their desired length
-        "OptimalNodeDistance": 500,  # Distance disconnected nodes want to be from eachother
-        "EdgeCount": 1,  # Counts the number of edges
-        "NodeCount": 1,  # Counts the number of edges
-        "HeuristicMultiplier": 0.008,  # A scale applied to the distance between nodes to calculate heuristic costs
-        "HelpPage": 1,  # Page number of the help section
-        "SPAStartNode": None,  # Stores the start node where a SPA will be performed
-        "SPAEndNode": None,  # Stores the end node where a SPA will be performed
-        "SPA": None,  # Stores the SPA that is being performed
-        "SelectedSPA": None,  # The SPA the user has selected to be performed
-        "Steps": [],
-        # When an SPA is run on a graph, a set of steps are created to show how to calculate the shortest route
-        "Step": 0,  # The index of the currently displayed step
-        "Edit": True,  # Boolean which determines if the user can edit their graph
-        "Defaults": {
-            "NodeColour": "#f42e2e",
-            "EdgeColour": "#5e6060",
-            "EdgeWeight": 10,
-            "EdgeLength": 10
-        }
-    }
+    sharedMemory = CreateSharedMemory(Vector2(pygame.display.get_desktop_sizes()[0]) - Vector2(0, 80), scaleBounds)
 
     # ~~~ INITIALISATION ~~~
 
     # Generate the UI from gui.py and retrieve the pygame surface and GUI manager
-    screen, mainUIManager, envUIManager = GenerateUI(sharedMemory["ScreenSize"])
+    screen, mainUIManager = GenerateUI(sharedMemory["ScreenSize"])
 
     sharedMemory["MainUIManager"] = mainUIManager
-    sharedMemory["EnvUIManager"] = envUIManager
 
     # Create a root variable for cleaner GetElement calls
     root = mainUIManager.get_root_container()
@@ -98,28 +59,15 @@ if __name__ == "__main__":
 
         # Update all UI elements
         mainUIManager.update(timedelta)
-        envUIManager.update(timedelta)
 
-        # Clear the screen
-        screen.fill(bgColour)
-
-        # Render the grid
-        for gridLine in grid:
-            pygame.draw.line(screen, gridColour, *gridLine)
-
-        # Render edges
-        for edge in sharedMemory["Edges"]:
-            edge.Draw(screen, sharedMemory)
+        # Draw the grid and graph, which are only redrawn when the camera moves or the graph changes
+        sharedMemory["Background"].Draw(screen, grid, sharedMemory, bgColour, gridColour)
 
         # If the user is trying to create an edge, a line is drawn between the cursor and starting node
         if edgeStart != None:
             pygame.draw.line(screen, sharedMemory["Defaults"]["EdgeColour"], EnvToScn(edgeStart.position, sharedMemory),
                              sharedMemory["MousePosition"], width=int(25 * sharedMemory["Scale"]))
 
-        # Render nodes
-        for node in sharedMemory["Nodes"]:
-            node.Draw(screen, sharedMemory)
-
         # Render selection area
 
         if selectionStart != None:
@@ -132,7 +80,6 @@ if __name__ == "__main__":
             screen.blit(shapeSurface, selectionRect)
 
         # Repaint the UI
-        envUIManager.draw_ui(screen)
         mainUIManager.draw_ui(screen)
 
         # Update displayed pygame surface
@@ -165,7 +112,6 @@ if __name__ == "__main__":
             elif event.type == pygame.VIDEORESIZE:
                 # Update the size of the screen
                 size = (event.w, event.h)
-                envUIManager.set_window_resolution(size)
                 mainUIManager.set_window_resolution(size)
                 sharedMemory["ScreenSize"] = Vector2(size)
                 changePersp = True
@@ -282,6 +228,17 @@ if __name__ == "__main__":
                     Save(sharedMemory, True)
                 elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
                     Save(sharedMemory, sharedMemory["SaveDir"] == None)
+                # Ctrl + L switches between the layout modes so they can be compared
+                elif event.key == pygame.K_l and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                    ToggleLayoutMode(sharedMemory)
+                # Ctrl + B turns long-range repulsion between all nodes on or off
+                elif event.key == pygame.K_b and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                    if not ToggleLongRangeForces(sharedMemory):
+                        Prompt(sharedMemory, mainUIManager, "Long-Range Forces Unavailable",
+                               "Long-range forces need NumPy and only work in the NumPy and Worker layout modes. Press Ctrl + L to switch layout mode.")
+                # Ctrl + H switches the heuristic used by A* between distance and landmarks
+                elif event.key == pygame.K_h and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                    ToggleHeuristic(sharedMemory)
 
             # Process a dialogue confirmation depending on its id
             elif event.type == pygame_gui.UI_CONFIRMATION_DIALOG_CONFIRMED:
@@ -295,11 +252,14 @@ if __name__ == "__main__":
                     changePersp = True
                 elif objectId == "#Save_Open_Prompt":
                     # Open a new file
-                    success = Open(sharedMemory)
+                    success, merged = Open(sharedMemory)
                     # If the file could not be opened, prompt the user
                     if not success:
                         Prompt(sharedMemory, mainUIManager, "File Could Not Be Opened",
                                "Your file could not be opened. This may be because the file has become corrupted")
+                    elif merged:
+                        Prompt(sharedMemory, mainUIManager, "Edges Merged",
+                               f"{merged} edge(s) connected nodes which were already connected. Only the edge with the lowest weight between each pair of nodes has been kept.")
                     changePersp = True
 
             # Process each button press respectively
@@ -372,12 +332,15 @@ if __name__ == "__main__":
                                actionButton="Yes")
                     else:
                         # Open a new file
-                        success = Open(sharedMemory)
+                        success, merged = Open(sharedMemory)
                         # If the file could not be opened, prompt the user
                         if not success:
                             Prompt(sharedMemory, mainUIManager, "File Could Not Be Opened",
                                    "Your file could not be opened. This may be because the file has become corrupted")
                         else:
+                            if merged:
+                                Prompt(sharedMemory, mainUIManager, "Edges Merged",
+                                       f"{merged} edge(s) connected nodes which were already connected. Only the edge with the lowest weight between each pair of nodes has been kept.")
                             changePersp = True
 
                 elif objectId == "#New":
@@ -412,6 +375,10 @@ if __name__ == "__main__":
                     sharedMemory["HelpPage"] -= 1
                     UpdateHelpSection(root, sharedMemory)
 
+                # Switch the heuristic used by A* between distance and landmarks
+                elif objectId == "#Heuristic_Toggle":
+                    ToggleHeuristic(sharedMemory)
+
                 # Allow the user to select a start/end node for their SPA
                 elif objectId in ["#Start_Node_Input", "#End_Node_Input"]:
                     # Set the selected tool to a temporary tool
@@ -443,6 +410,9 @@ if __name__ == "__main__":
                     elif sharedMemory["SelectedSPA"] == "A* Algorithm":
                         # Run the A* function
                         AStar(sharedMemory, root)
+                    elif sharedMemory["SelectedSPA"] == "Bidirectional Dijkstra":
+                        # Run the bidirectional Dijkstra function
+                        BidirectionalDijkstra(sharedMemory, root)
                     # Apply the first step to the environment
                     ApplyStep(sharedMemory, root)
 
@@ -456,8 +426,7 @@ if __name__ == "__main__":
                     GetElement(root, "#Explantion_Window").hide()
                     # Undo all changes to the graph
                     RestartSteps(sharedMemory, root, True)
-                    for node in sharedMemory["Nodes"]:
-                        node.UpdateLabel(sharedMemory)
+                    RefreshLabels(sharedMemory)
                 # Go to next step
                 elif objectId == "#Step_Forward":
                     ApplyStep(sharedMemory, root, 1)
@@ -473,6 +442,9 @@ if __name__ == "__main__":
                 # Return to the first step
                 elif objectId == "#Skip_Backward":
                     RestartSteps(sharedMemory, root)
+            # Jump to a step when the timeline is moved
+            elif event.type == pygame_gui.UI_HORIZONTAL_SLIDER_MOVED and event.ui_element.object_ids[-1] == "#Step_Timeline":
+                SeekStep(sharedMemory, root, event.value)
             # Update the text when the slider moves
             elif event.type == pygame_gui.UI_HORIZONTAL_SLIDER_MOVED:
                 # Record the slider which is currently being moved
@@ -562,7 +534,6 @@ if __name__ == "__main__":
 
             # Run pygame_gui builtin function which finalises event processing
             mainUIManager.process_events(event)
-            envUIManager.process_events(event)
 
         # Update the node paramaters for the SPA properties
         UpdateSPProperties(root, sharedMemory)
@@ -574,7 +545,7 @@ if __name__ == "__main__":
         changePersp = changePersp or MoveCamera(root, timedelta, mouseStates, sharedMemory)
 
         # Adjust nodes
-        NodeReadjustment(sharedMemory, timedelta)
+        Readjust(sharedMemory, timedelta)
 
         # Update the grid when the camera position / scale changes
         if changePersp:
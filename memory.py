@@ -0,0 +1,79 @@
+# This file creates the dictionary of parameters which is shared between all functions, known as shared memory
+# It is kept apart from main.py so that the same starting values can be used without opening the program's window
+
+from pygame.math import Vector2
+from spatial import SpatialIndex
+from render import Background
+from labels import LabelLayer
+
+# Returns the shared memory of a new, empty environment shown on a screen of the given size
+def CreateSharedMemory(screenSize, scaleBounds):
+    return {
+        "Run": True,  # This boolean will determine when all threads should close
+        "CameraPosition": Vector2(0, 0),  # Represents the user's position in the environment
+        "ScaleBounds": scaleBounds,  # The scale of the environment must be contained to these bounds
+        "Scale": scaleBounds[0],  # The scale in the environment view
+        "ScreenSize": Vector2(screenSize),  # The size of the screen
+        "MousePosition": Vector2(0, 0),  # Contains where the mouse currently is on screen
+        "MouseMovement": Vector2(0, 0),  # Contains the relative movement of the mouse
+        "SelectedTool": "#Select",  # The tool that should be used when the left click button is pressed
+        "Selected": [],  # Represents the currently selected object
+        "SelectionColour": "#00d0f9",  # The outline colour of selected nodes/edges
+        "NodeSprites": {},  # Caches a drawing of each node's circle for each radius and pair of colours
+        "NodeSpriteScale": None,  # The scale the cached node sprites were drawn at
+        "SaveDir": None,  # The default location used to save files
+        "Changed": False,  # The graph has not been saved in this state
+        "Drag": False,  # Denotes if the selected object should be dragged
+        "UndoStack": [],  # A collection of operations that can be undone
+        "RedoStack": [],  # A collection of operations that can be redone
+        "Nodes": [],  # Contains all nodes in the environment
+        "Edges": [],  # Contains all edges in the environment
+        "NodeIndex": {},  # Maps the unique id of each node onto the node
+        "EdgeIndex": {},  # Maps the unique id of each edge onto the edge
+        "SpatialIndex": SpatialIndex(1000),  # Finds the nodes and edges in an area of the environment
+        "Labels": LabelLayer(),  # Draws the labels of nodes and edges
+        "GraphVersion": 0,  # Increases whenever nodes or edges are created, destroyed or have their weight/length changed
+        "SceneVersion": 0,  # Increases whenever nodes or edges move or change how they look
+        "LabelVersion": 0,  # Increases whenever the text of every label may have changed
+        "Background": Background(),  # The grid and graph drawn in the last frame, which is reused until something on it changes
+        "LayoutMode": "NumPy",  # Whether nodes are adjusted using NumPy arrays, NumPy on a worker thread or pure Python ("NumPy"/"Worker"/"Python")
+        "Layout": None,  # The layout engine used in NumPy/Worker mode, created when first needed
+        "LayoutVersion": 0,  # The graph version the layout was last woken for
+        "LayoutAsleep": False,  # Nodes are not adjusted while the layout is asleep
+        "LayoutAnchor": None,  # Node positions the layout compares against to tell when it has settled
+        "LayoutFrames": 0,  # The number of frames since the anchor positions were recorded
+        "SleepFrames": 60,  # The number of frames between each check of whether the layout has settled
+        "SleepDistance": 25,  # The layout sleeps if nodes move less than this between checks, as a root mean square
+        "LongRangeForces": False,  # Whether all nodes repel eachother using the Barnes-Hut approximation, which needs NumPy
+        "BarnesHutTheta": 0.8,  # Larger values make long-range repulsion faster but less accurate
+        "LengthToUnitRatio": 25,  # One unit of length in an edge represents 25 units in the environment
+        "MaxForce": 500,  # Maximum force which can be applied to nodes
+        "AdjustmentRate": 200,  # The rate at which nodes connected by an edge move to reach their desired length
+        "OptimalNodeDistance": 500,  # Distance disconnected nodes want to be from eachother
+        "EdgeCount": 1,  # Counts the number of edges
+        "NodeCount": 1,  # Counts the number of edges
+        "HeuristicMultiplier": 0.008,  # A scale applied to the distance between nodes to calculate heuristic costs
+        "Heuristic": "Distance",  # Whether A* uses the distance to the end node or costs from landmark nodes as its heuristic ("Distance"/"Landmarks")
+        "LandmarkCount": 8,  # The number of landmark nodes used by the landmark heuristic
+        "Landmarks": None,  # The graph version and landmark costs last worked out for the landmark heuristic
+        "DrawOrder": None,  # The graph version and position of each node and edge in the order they are drawn
+        "View": None,  # The graph version, list of nodes and compact view of the graph last used by a SPA
+        "HelpPage": 1,  # Page number of the help section
+        "SPAStartNode": None,  # Stores the start node where a SPA will be performed
+        "SPAEndNode": None,  # Stores the end node where a SPA will be performed
+        "SPA": None,  # Stores the SPA that is being performed
+        "SearchState": None,  # The costs of nodes during the SPA being performed
+        "SelectedSPA": None,  # The SPA the user has selected to be performed
+        "Steps": [],
+        # When an SPA is run on a graph, a set of steps are created to show how to calculate the shortest route
+        "Step": 0,  # The index of the currently displayed step
+        "CheckpointInterval": 25,  # The number of steps between each recorded state of the graph during a SPA
+        "MaxCheckpoints": 64,  # The most checkpoints kept for one SPA before they are recorded less often
+        "Edit": True,  # Boolean which determines if the user can edit their graph
+        "Defaults": {
+            "NodeColour": "#f42e2e",
+            "EdgeColour": "#5e6060",
+            "EdgeWeight": 10,
+            "EdgeLength": 10
+        }
+    }
@@ -1,7 +1,7 @@
 # A set of classes responsible for performing "operations"
 # These are actions that can be undone/redone
 
-from functions import NodeFromID, EdgeFromID, UpdatePropertiesUI, UpdateSelection
+from functions import NodeFromID, EdgeFromID, ObjectFromID, UpdatePropertiesUI, UpdateSelection, SceneChanged, GetProperty, SetProperty, LABEL_ATTRIBUTES, GRAPH_ATTRIBUTES
 from graph import Node, Edge
 
 # This is the base class for the operations to prevent repetition of initialisation code.
@@ -17,43 +17,64 @@ class Operation:
 # This class will be used by the properties panel to apply changes to the graph
 # It will also be a fundamental component for visualising SP algorithms
 class ChangeProperty(Operation):
+    # Returns the node/edge this operation changes
+    def Object(self,sharedMemory):
+        if "object" in self.arguments:
+            return self.arguments["object"]
+        return ObjectFromID(self.arguments["type"],self.arguments["id"],sharedMemory)
+    # Returns a (type, id, attribute) key which identifies the property this operation changes
+    def Key(self):
+        if "object" in self.arguments:
+            return (self.arguments["object"].type,self.arguments["object"].id,self.arguments["attr"])
+        return (self.arguments["type"],self.arguments["id"],self.arguments["attr"])
+    # Records the value this operation sets in a dictionary of pending changes instead of changing the graph
+    # This allows many operations to be combined so each property is only changed once
+    def Fold(self,sharedMemory,pending):
+        key = self.Key()
+        if "object" in self.arguments:
+            # The old value is whatever the property would be once the earlier pending changes are made
+            if "old" not in self.arguments:
+                self.arguments["old"] = pending[key] if key in pending else GetProperty(sharedMemory,self.arguments["object"],key[2])
+            self.arguments["type"] = key[0]
+            self.arguments["id"] = key[1]
+            self.arguments.pop("object")
+        pending[key] = self.arguments["value"]
     def Forward(self,sharedMemory):
+        object = self.Object(sharedMemory)
         # First-time forward function
         if "object" in self.arguments:
             # Get the old value
-            object = self.arguments["object"]
             if "old" not in self.arguments:
                 # Only set the original value if not already specified on init
-                self.arguments["old"] = getattr(object,self.arguments["attr"])
+                self.arguments["old"] = GetProperty(sharedMemory,object,self.arguments["attr"])
             # Record the type of object (node/edge) and its id so it can be retrieved later
+            # Executing forward function again will use the type and id keys
             self.arguments["type"] = object.type
             self.arguments["id"] = object.id
             # Remove the object key
             self.arguments.pop("object")
-        # Executing forward function again will use the type and id keys
-        elif self.arguments["type"] == "Node":
-            object = NodeFromID(self.arguments["id"],sharedMemory)
-        elif self.arguments["type"] == "Edge":
-            object = EdgeFromID(self.arguments["id"],sharedMemory)
 
         # Update the value
-        setattr(object,self.arguments["attr"],self.arguments["value"])
+        SetProperty(sharedMemory,object,self.arguments["attr"],self.arguments["value"])
         # Update UI values where appropriate
-        if self.arguments["attr"] in ["weight","name","cost","wCost","hCost","tCost"]:
+        if self.arguments["attr"] in LABEL_ATTRIBUTES:
             object.UpdateLabel(sharedMemory)
+        if self.arguments["attr"] in GRAPH_ATTRIBUTES:
+            sharedMemory["GraphVersion"] += 1
+        SceneChanged(sharedMemory)
         if object in sharedMemory["Selected"]:
             UpdatePropertiesUI(sharedMemory)
     def Backward(self,sharedMemory):
         # Get the most recent instance of the associated object
-        if self.arguments["type"] == "Node":
-            object = NodeFromID(self.arguments["id"],sharedMemory)
-        elif self.arguments["type"] == "Edge":
-            object = EdgeFromID(self.arguments["id"],sharedMemory)
+        object = self.Object(sharedMemory)
         
         # Update the value to its original value
-        setattr(object,self.arguments["attr"],self.arguments["old"])
-        if self.arguments["attr"] in ["weight","name","cost","wCost","hCost","tCost"]:
+        SetProperty(sharedMemory,object,self.arguments["attr"],self.arguments["old"])
+        if self.arguments["attr"] in LABEL_ATTRIBUTES:
             object.UpdateLabel(sharedMemory)
+        if self.arguments["attr"] in GRAPH_ATTRIBUTES:
+            sharedMemory["GraphVersion"] += 1
+        SceneChanged(sharedMemory)
         if object in sharedMemory["Selected"]:
             UpdatePropertiesUI(sharedMemory)
 
@@ -135,9 +156,9 @@ class DeleteNodeOperation(Operation):
             self.arguments["radius"] = node.radius
             self.edgeOps = []
             # Create an operation for each connected edge which is deleted
-            while len(node.connectedEdges):
+            for edge in list(node.connectedEdges):
                 # This edge operation is not added to the stack
-                edgeOp = DeleteEdgeOperation(sharedMemory,toStack = False,edge=node.connectedEdges[0])
+                edgeOp = DeleteEdgeOperation(sharedMemory,toStack = False,edge=edge)
                 # The forward function must be called seperately to delete the edge and store edge data
                 edgeOp.Forward(sharedMemory)
                 self.edgeOps.append(edgeOp)
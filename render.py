@@ -0,0 +1,138 @@
+# This file contains code for drawing the environment
+# The grid and the graph are drawn onto a background surface which is kept between frames
+# The background is only redrawn when the camera moves or something drawn on it changes, otherwise it is copied straight onto the screen
+# When zoomed out over many nodes, the graph is drawn with less detail so that it doesn't take longer to draw the more there is on screen
+
+from functions import VisibleObjects, DrawOrder, CameraTransform, ScreenPositions
+from pygame import Color
+import pygame
+import math
+
+# Levels of detail the graph can be drawn with, from most to least detailed
+# Full: every node, edge and label is drawn
+# No labels: labels are left out
+# Points: nodes are drawn as small squares and edges as thin lines
+# Tiles: the environment is split into tiles, which are shaded by how many nodes are in them
+LOD_FULL = 0
+LOD_NO_LABELS = 1
+LOD_POINTS = 2
+LOD_TILES = 3
+# How crowded the screen is at which each level of detail, after full detail, starts
+# This is the number of visible nodes per 100x100 pixels of screen when nodes are drawn with a radius of LOD_RADIUS pixels
+LOD_DENSITIES = (0.5,2,8)
+# The radius in pixels the densities above are measured for, which is a default node at the scale the program starts at
+# Nodes drawn larger than this are worth drawing in more detail, so the screen has to be more crowded before detail is left out
+LOD_RADIUS = 15
+# The width of the squares nodes are drawn as, in pixels
+POINT_SIZE = 3
+# The width of the tiles nodes are grouped into, in pixels
+TILE_SIZE = 16
+# Tiles with at least this many nodes are drawn in the full colour of their nodes
+TILE_FULL_COUNT = 4
+
+# The retained background layer of the environment
+class Background:
+    def __init__(self):
+        self.surface = None
+        self.key = None # Everything the background was last drawn for
+    # Returns everything the background depends on, the background is redrawn when any of these change
+    def Key(self,screen,sharedMemory):
+        camera = sharedMemory["CameraPosition"]
+        return (screen.get_size(),(camera.x,camera.y),sharedMemory["Scale"],sharedMemory["GraphVersion"],sharedMemory["SceneVersion"])
+    # Copies the background onto the screen, redrawing it first if it is out of date
+    def Draw(self,screen,grid,sharedMemory,bgColour,gridColour):
+        key = self.Key(screen,sharedMemory)
+        if key != self.key:
+            if self.surface == None or self.surface.get_size() != screen.get_size():
+                self.surface = pygame.Surface(screen.get_size()).convert()
+            self.surface.fill(bgColour)
+            # Render the grid
+            for gridLine in grid:
+                pygame.draw.line(self.surface, gridColour, *gridLine)
+            DrawGraph(self.surface,sharedMemory,bgColour)
+            # Labels brought up to date while drawing change the scene, but have already been drawn
+            self.key = self.Key(screen,sharedMemory)
+        screen.blit(self.surface,(0,0))
+
+# Returns the level of detail the graph should be drawn with for the nodes on screen and the current scale
+# The number of nodes per 100x100 pixels is weighed against how large they are drawn, so zooming in over the same nodes gives more detail
+# Small graphs are drawn in full detail at every scale
+def DetailLevel(sharedMemory,nodes):
+    if len(nodes) == 0:
+        return LOD_FULL
+    screenSize = sharedMemory["ScreenSize"]
+    radius = sum(node.radius for node in nodes) / len(nodes) * sharedMemory["Scale"]
+    density = len(nodes) * 10000 / max(screenSize.x * screenSize.y,1)
+    density *= (LOD_RADIUS / max(radius,1))**2
+    level = LOD_FULL
+    for i in range(len(LOD_DENSITIES)):
+        if density >= LOD_DENSITIES[i]:
+            level = i + 1
+    return level
+
+# Draws the nodes and edges on screen along with their labels
+def DrawGraph(surface,sharedMemory,bgColour):
+    # Only nodes and edges on screen are drawn
+    # They are drawn in the order of the lists of nodes and edges so overlapping nodes are layered consistently
+    visible = sorted(VisibleObjects(sharedMemory), key=DrawOrder(sharedMemory).__getitem__)
+    nodes = [object for object in visible if object.type == "Node"]
+    edges = [object for object in visible if object.type == "Edge"]
+    level = DetailLevel(sharedMemory,nodes)
+    # Labels which aren't drawn give up their surfaces
+    if level != LOD_FULL:
+        sharedMemory["Labels"].Hide()
+    if level == LOD_TILES:
+        DrawTiles(surface,sharedMemory,nodes,bgColour)
+        return
+    # Every node drawn is converted to screen space in one pass, including nodes off screen at the end of visible edges
+    positions = ScreenPositions(set(nodes).union(*((edge.nodeA,edge.nodeB) for edge in edges)),sharedMemory)
+    if level == LOD_POINTS:
+        DrawPoints(surface,sharedMemory,nodes,edges,positions)
+        return
+    # Render edges
+    for edge in edges:
+        edge.Draw(surface, sharedMemory, positions)
+    # Render nodes
+    # Each node is a cached sprite, so they are all drawn in one batch
+    surface.blits([node.Blit(sharedMemory, positions) for node in nodes], doreturn=False)
+    # Render labels over the graph, with node labels over edge labels
+    if level == LOD_FULL:
+        sharedMemory["Labels"].Draw(surface, edges + nodes, positions, sharedMemory)
+
+# Returns the colour a node or edge is drawn in when there is no room for its outline
+# Selected objects are drawn in the selection colour so they can still be found
+def FlatColour(object,sharedMemory):
+    if object.selected:
+        return sharedMemory["SelectionColour"]
+    return object.colour
+
+# Draws nodes as small squares and edges as thin lines
+def DrawPoints(surface,sharedMemory,nodes,edges,positions):
+    for edge in edges:
+        pygame.draw.line(surface,FlatColour(edge,sharedMemory),positions[edge.nodeA],positions[edge.nodeB])
+    offset = POINT_SIZE // 2
+    for node in nodes:
+        x,y = positions[node]
+        surface.fill(FlatColour(node,sharedMemory),(int(x) - offset,int(y) - offset,POINT_SIZE,POINT_SIZE))
+
+# Groups nodes into tiles and shades each tile in the average colour of its nodes
+# Tiles with fewer nodes are faded towards the background colour
+# The tiles are fixed in the environment rather than on screen, so they don't flicker as the camera moves
+def DrawTiles(surface,sharedMemory,nodes,bgColour):
+    size = TILE_SIZE / sharedMemory["Scale"]
+    tiles = {} # Maps each tile onto the number of nodes in it and the sums of their colours
+    for node in nodes:
+        key = (math.floor(node.position.x / size),math.floor(node.position.y / size))
+        colour = Color(FlatColour(node,sharedMemory))
+        tile = tiles.setdefault(key,[0,0,0,0])
+        tile[0] += 1
+        tile[1] += colour.r
+        tile[2] += colour.g
+        tile[3] += colour.b
+    bgColour = Color(bgColour)
+    scale,offsetX,offsetY = CameraTransform(sharedMemory)
+    for (x,y),(count,r,g,b) in tiles.items():
+        colour = bgColour.lerp(Color(r // count,g // count,b // count),min(count / TILE_FULL_COUNT,1))
+        # The y-axis is flipped on screen, so the top left corner of the tile is its highest y position
+        corner = (int(x * size * scale + offsetX),int(offsetY - (y + 1) * size * scale))
+        surface.fill(colour,(*corner,TILE_SIZE + 1,TILE_SIZE + 1))
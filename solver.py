@@ -0,0 +1,367 @@
+# A file containing shortest path solvers which work on a compact view of a graph.
+# This file has no dependency on pygame, the UI or shared memory so searches can be run without a display.
+# The step-producing functions in algorithm.py are built on top of the searches here.
+
+import heapq
+import math
+
+# ~~~ GRAPH VIEW ~~~
+
+# A compact, read-only copy of a graph
+# Each node is referred to by an index from 0 to n-1 rather than by its object
+class GraphView:
+    def __init__(self,ids,adjacency,positions = None):
+        self.ids = ids # ids[i] is the unique id of the node with index i
+        self.index = {id : i for i,id in enumerate(ids)} # Maps a node's unique id back onto its index
+        self.adjacency = adjacency # adjacency[i] is a list of (neighbour index, weight) pairs
+        self.positions = positions # positions[i] is an (x,y) tuple of where the node is in the environment
+    def __len__(self):
+        return len(self.ids)
+
+# Creates a graph view from a list of node objects
+# Neighbours are kept in the same order as each node's connected nodes so ties are broken in the same way
+def BuildView(nodes):
+    index = {node : i for i,node in enumerate(nodes)}
+    adjacency = []
+    for node in nodes:
+        adjacency.append([(index[other],node.GetEdgeTo(other).weight) for other in node.connectedNodes])
+    return GraphView([node.id for node in nodes],adjacency,NodePositions(nodes))
+
+# The positions of a list of node objects, read from the nodes whenever they are needed
+# This means a view stays correct as nodes are moved, so it only needs to be rebuilt when the graph itself changes
+class NodePositions:
+    def __init__(self,nodes):
+        self.nodes = nodes
+    def __getitem__(self,i):
+        position = self.nodes[i].position
+        return (position.x,position.y)
+    def __len__(self):
+        return len(self.nodes)
+
+# ~~~ HEURISTICS ~~~
+
+# Creates a heuristic which uses the direct distance to the end node, scaled to fit with edge weights
+# Positions are copied when the heuristic is created, so nodes moved by the layout during a search don't change its heuristic costs
+def DistanceHeuristic(view,end,multiplier):
+    positions = [view.positions[i] for i in range(len(view))]
+    endX,endY = positions[end]
+    def Heuristic(i):
+        x,y = positions[i]
+        return int(math.sqrt((x - endX)**2 + (y - endY)**2) * multiplier)
+    return Heuristic
+
+# Holds the cost from each of a set of landmark nodes to every node, used by the ALT (A*, landmarks, triangle inequality) heuristic
+# Landmarks are shared between the connected parts of the graph by size, and nodes without any edges never get one as no route passes through them
+# Within each part, landmarks are picked farthest-first: each new landmark is the reachable node furthest from every landmark picked so far
+class Landmarks:
+    def __init__(self,view,count):
+        self.landmarks = [] # Indices of the landmark nodes
+        self.distances = [] # distances[j][i] is the cost from landmark j to node i, or infinity if there is no route
+        components = [component for component in Components(view) if len(component) > 1]
+        total = sum(len(component) for component in components)
+        if total == 0:
+            return
+        # Each part gets its share of the landmarks, with any left over going to the largest parts
+        components.sort(key = len,reverse = True)
+        shares = [count * len(component) // total for component in components]
+        for j in range(count - sum(shares)):
+            shares[j % len(shares)] += 1
+        for component,share in zip(components,shares):
+            if share > 0:
+                self.PickLandmarks(view,component,share)
+    # Picks landmarks from one connected part of the graph
+    def PickLandmarks(self,view,component,count):
+        # The first landmark is the node furthest from an arbitrary node in the part
+        nearest = Distances(view,component[0])
+        for j in range(min(count,len(component))):
+            landmark = max(component,key = lambda i: nearest[i])
+            if nearest[landmark] == 0 and j > 0:
+                # Every node is a landmark or can't be told apart from one
+                break
+            self.landmarks.append(landmark)
+            distances = Distances(view,landmark)
+            self.distances.append(distances)
+            # Record how far each node is from its nearest landmark
+            if j == 0:
+                nearest = list(distances)
+            else:
+                nearest = [min(a,b) for a,b in zip(nearest,distances)]
+
+# Returns the indices of the nodes in each connected part of a graph view
+def Components(view):
+    component = [None] * len(view)
+    components = []
+    for source in range(len(view)):
+        if component[source] != None:
+            continue
+        component[source] = len(components)
+        nodes = [source]
+        unexplored = [source]
+        while unexplored != []:
+            node = unexplored.pop()
+            for other,weight in view.adjacency[node]:
+                if component[other] == None:
+                    component[other] = len(components)
+                    nodes.append(other)
+                    unexplored.append(other)
+        components.append(nodes)
+    return components
+
+# Returns the lowest cost from a node to every node in a graph view, with infinity for nodes which can't be reached
+def Distances(view,source):
+    distances = [math.inf] * len(view)
+    distances[source] = 0
+    unexplored = [(0,source)]
+    while unexplored != []:
+        cost, node = heapq.heappop(unexplored)
+        if cost != distances[node]:
+            continue
+        for other,weight in view.adjacency[node]:
+            if cost + weight < distances[other]:
+                distances[other] = cost + weight
+                heapq.heappush(unexplored,(cost + weight,other))
+    return distances
+
+# Creates the ALT heuristic for an end node from a set of landmark distances
+# As edges can be crossed either way, the triangle inequality gives cost(i,end) >= |cost(L,end) - cost(L,i)| for any landmark L
+# The heuristic is the largest of these lower bounds, so it never overestimates the cost to the end node
+def LandmarkHeuristic(landmarks,end):
+    ends = [distances[end] for distances in landmarks.distances]
+    def Heuristic(i):
+        best = 0
+        for distances,endDistance in zip(landmarks.distances,ends):
+            # Landmarks which can't reach both nodes give no bound
+            if distances[i] != math.inf and endDistance != math.inf:
+                best = max(best,abs(endDistance - distances[i]))
+        return best
+    return Heuristic
+
+# ~~~ SEARCHES ~~~
+
+# A single search between two nodes of a graph view
+# Without a heuristic this performs Dijkstra's algorithm, with one it performs A*
+class Search:
+    def __init__(self,view,start,end,heuristic = None):
+        self.view = view
+        self.start = start # Index of the start node
+        self.end = end # Index of the end node
+        self.heuristic = heuristic
+        # The state of the search is stored here rather than on the nodes
+        self.cost = {start : 0} # The lowest known weighted cost to reach each node
+        self.hCost = {} # The heuristic cost of each node which has been found
+        self.fromN = {} # The node each node's lowest cost came from
+        self.explored = set() # Nodes whose lowest cost is final
+        self.reached = False # Becomes true when the end node is explored
+        # Statistics about the search
+        self.relaxations = 0
+        self.pushes = 0
+    # Returns the heuristic cost of a node, calculating it the first time it is needed
+    def HCost(self,i):
+        if self.heuristic == None:
+            return 0
+        if i not in self.hCost:
+            self.hCost[i] = self.heuristic(i)
+        return self.hCost[i]
+    # Returns the total cost of a node
+    def TCost(self,i):
+        return self.cost.get(i,math.inf) + self.HCost(i)
+    # A generator which performs the search, pausing to yield each event as it happens:
+    # ("Select", node) when a node is explored
+    # ("Cost", node, previous node, old cost, new cost) when a lower cost is found for a node
+    def Events(self):
+        adjacency = self.view.adjacency
+        cost = self.cost
+        explored = self.explored
+        # Unexplored nodes are kept in a heap of (total cost, order, node) entries.
+        # The order a node was first found in breaks ties so the lowest cost node found first is always selected
+        unexplored = [(self.TCost(self.start),0,self.start)]
+        found = {self.start : 0}
+        while unexplored != []:
+            tCost, order, best = heapq.heappop(unexplored)
+            # Entries left behind when a node's cost was lowered are skipped
+            if best in explored or tCost != self.TCost(best):
+                continue
+            explored.add(best)
+            yield ("Select",best)
+            # If the end node has been reached then the search is complete
+            if best == self.end:
+                self.reached = True
+                return
+            bestCost = cost[best]
+            for node,weight in adjacency[best]:
+                # Calculate the cost to reach this node
+                newCost = bestCost + weight
+                oldCost = cost.get(node,math.inf)
+                # If the cost is a new best, the cost is updated and it is recorded where the route came from
+                if newCost < oldCost:
+                    self.relaxations += 1
+                    cost[node] = newCost
+                    self.fromN[node] = best
+                    yield ("Cost",node,best,oldCost,newCost)
+                    # Explored nodes are never reconsidered
+                    if node not in explored:
+                        if node not in found:
+                            found[node] = len(found)
+                        self.pushes += 1
+                        heapq.heappush(unexplored,(newCost + self.HCost(node),found[node],node))
+    # Performs the whole search without stopping
+    def Run(self):
+        for event in self.Events():
+            pass
+        return self
+    # The list of node indices along the shortest path, or None if there is no path
+    def Path(self):
+        if not self.reached:
+            return None
+        path = [self.end]
+        while path[-1] != self.start:
+            path.append(self.fromN[path[-1]])
+        return path[::-1]
+    # The cost of the shortest path, or infinity if there is no path
+    def RouteCost(self):
+        return self.cost[self.end] if self.reached else math.inf
+    # The number of nodes whose lowest cost was made final
+    def ExploredCount(self):
+        return len(self.explored)
+
+# The two directions of a bidirectional search
+FORWARD = 0
+BACKWARD = 1
+
+# A bidirectional Dijkstra search between two nodes of a graph view
+# One search moves forward from the start node and another moves backward from the end node, each exploring whichever of the two has the lower cost next
+# Every time a node has been reached by both searches, the route through it is a candidate for the shortest route
+# The searches stop once the lowest costs left in the two searches add up to at least the cost of the best route found,
+# as any route through an unexplored node would then cost at least as much
+class BidirectionalSearch:
+    def __init__(self,view,start,end):
+        self.view = view
+        self.start = start # Index of the start node
+        self.end = end # Index of the end node
+        # Each piece of state is a pair, with the forward search's first and the backward search's second
+        self.cost = ({start : 0},{end : 0}) # The lowest known cost to reach each node from the start/end node
+        self.fromN = ({},{}) # The node each node's lowest cost came from
+        self.explored = (set(),set()) # Nodes whose lowest cost is final
+        self.best = math.inf # The cost of the best route found so far
+        self.meet = None # The node the best route passes through where the two searches met
+        self.reached = False # Becomes true once the best route is known to be the shortest
+        # Routes are only found when an edge is followed to a node the other search has reached
+        # When the start node is the end node, it is already a route of its own
+        if start == end:
+            self.best = 0
+            self.meet = start
+        # Statistics about the search
+        self.relaxations = 0
+        self.pushes = 0
+    # Neither search uses a heuristic, so every node's heuristic cost is 0, as in a Search without one
+    def HCost(self,i):
+        return 0
+    # A generator which performs the search, pausing to yield each event as it happens:
+    # ("Select", direction, node) when a node is explored by one of the searches
+    # ("Cost", direction, node, previous node, old cost, new cost) when one of the searches finds a lower cost for a node
+    # ("Meet", node, route cost) when a better route is found through a node reached by both searches
+    # ("Stop", forward cost, backward cost) when the lowest costs left in each search show the best route is the shortest
+    def Events(self):
+        adjacency = self.view.adjacency
+        # Each search keeps its unexplored nodes in a heap of (cost, order, node) entries, as in Search
+        unexplored = ([(0,0,self.start)],[(0,0,self.end)])
+        found = ({self.start : 0},{self.end : 0})
+        # If either search runs out of nodes, every route has been considered
+        while unexplored[FORWARD] != [] and unexplored[BACKWARD] != []:
+            forwardCost = unexplored[FORWARD][0][0]
+            backwardCost = unexplored[BACKWARD][0][0]
+            # Entries left behind when a node's cost was lowered are never below the node's real cost, so this never stops too early
+            if forwardCost + backwardCost >= self.best:
+                yield ("Stop",forwardCost,backwardCost)
+                break
+            direction = FORWARD if forwardCost <= backwardCost else BACKWARD
+            cost = self.cost[direction]
+            otherCost = self.cost[1 - direction]
+            explored = self.explored[direction]
+            nodeCost, order, best = heapq.heappop(unexplored[direction])
+            # Entries left behind when a node's cost was lowered are skipped
+            if best in explored or nodeCost != cost[best]:
+                continue
+            explored.add(best)
+            yield ("Select",direction,best)
+            for node,weight in adjacency[best]:
+                newCost = nodeCost + weight
+                oldCost = cost.get(node,math.inf)
+                if newCost < oldCost:
+                    self.relaxations += 1
+                    cost[node] = newCost
+                    self.fromN[direction][node] = best
+                    yield ("Cost",direction,node,best,oldCost,newCost)
+                    if node not in explored:
+                        if node not in found[direction]:
+                            found[direction][node] = len(found[direction])
+                        self.pushes += 1
+                        heapq.heappush(unexplored[direction],(newCost,found[direction][node],node))
+                    # The node has been reached by both searches, so there is a route through it
+                    if node in otherCost and newCost + otherCost[node] < self.best:
+                        self.best = newCost + otherCost[node]
+                        self.meet = node
+                        yield ("Meet",node,self.best)
+        self.reached = self.meet != None
+    # Performs the whole search without stopping
+    def Run(self):
+        for event in self.Events():
+            pass
+        return self
+    # The list of node indices along the shortest path, or None if there is no path
+    # The path is followed back from where the searches met to the start node, then on to the end node
+    def Path(self):
+        if not self.reached:
+            return None
+        path = [self.meet]
+        while path[-1] != self.start:
+            path.append(self.fromN[FORWARD][path[-1]])
+        path.reverse()
+        while path[-1] != self.end:
+            path.append(self.fromN[BACKWARD][path[-1]])
+        return path
+    # The cost of the shortest path, or infinity if there is no path
+    def RouteCost(self):
+        return self.best
+    # The number of nodes whose lowest cost was made final by either search
+    def ExploredCount(self):
+        return len(self.explored[FORWARD]) + len(self.explored[BACKWARD])
+
+# The outcome of a search given in node ids
+class SearchResult:
+    def __init__(self,search,stats):
+        path = search.Path()
+        self.path = None if path == None else [search.view.ids[i] for i in path]
+        self.cost = search.RouteCost()
+        self.stats = None
+        if stats:
+            self.stats = {
+                "Explored" : search.ExploredCount(),
+                "Relaxations" : search.relaxations,
+                "Pushes" : search.pushes
+            }
+    def __repr__(self):
+        return f"SearchResult(path = {self.path}, cost = {self.cost})"
+
+# Find the shortest path between two node ids using Dijkstra's algorithm
+def DijkstraPath(view,startId,endId,stats = False):
+    search = Search(view,view.index[startId],view.index[endId]).Run()
+    return SearchResult(search,stats)
+
+# Find the shortest path between two node ids using A* with the ALT heuristic
+# The landmarks should be made from the same view, and can be reused for any number of searches on it
+def LandmarkAStarPath(view,startId,endId,landmarks,stats = False):
+    end = view.index[endId]
+    search = Search(view,view.index[startId],end,LandmarkHeuristic(landmarks,end)).Run()
+    return SearchResult(search,stats)
+
+# Find the shortest path between two node ids using bidirectional Dijkstra's algorithm
+def BidirectionalDijkstraPath(view,startId,endId,stats = False):
+    search = BidirectionalSearch(view,view.index[startId],view.index[endId]).Run()
+    return SearchResult(search,stats)
+
+# Find the shortest path between two node ids using A*
+def AStarPath(view,startId,endId,multiplier,stats = False):
+    end = view.index[endId]
+    search = Search(view,view.index[startId],end,DistanceHeuristic(view,end,multiplier)).Run()
+    return SearchResult(search,stats)
@@ -0,0 +1,58 @@
+# This file contains a spatial index used to quickly find the nodes and edges in an area of the environment
+# It has no dependencies on other files so it can be used anywhere
+
+import math
+
+# A uniform grid of square cells
+# Each object is stored in every cell its bounding box covers, so only cells overlapping an area need to be checked to find what is in it
+class SpatialIndex:
+    def __init__(self,cellSize):
+        self.cellSize = cellSize
+        self.cells = {} # Maps (x,y) cell coordinates onto the set of objects in that cell
+        self.ranges = {} # Maps each object onto the range of cells it is stored in
+    # Returns the range of cells (x0,y0,x1,y1) covered by a bounding box in the environment
+    def CellRange(self,low,high):
+        size = self.cellSize
+        return (math.floor(low[0] / size),math.floor(low[1] / size),math.floor(high[0] / size),math.floor(high[1] / size))
+    # Adds an object with a bounding box from low to high
+    def Insert(self,object,low,high):
+        cellRange = self.CellRange(low,high)
+        self.ranges[object] = cellRange
+        x0,y0,x1,y1 = cellRange
+        for x in range(x0,x1+1):
+            for y in range(y0,y1+1):
+                self.cells.setdefault((x,y),set()).add(object)
+    # Removes an object from the index
+    def Remove(self,object):
+        x0,y0,x1,y1 = self.ranges.pop(object)
+        for x in range(x0,x1+1):
+            for y in range(y0,y1+1):
+                cell = self.cells[(x,y)]
+                cell.discard(object)
+                if not cell:
+                    del self.cells[(x,y)]
+    # Updates the bounding box of an object, which only changes the index if the object has moved into different cells
+    def Move(self,object,low,high):
+        if self.ranges.get(object) == self.CellRange(low,high):
+            return
+        if object in self.ranges:
+            self.Remove(object)
+        self.Insert(object,low,high)
+    # Returns the set of objects stored in any cell overlapping an area from low to high
+    # Objects near the area may also be returned, so exact checks should still be made where needed
+    def Query(self,low,high):
+        x0,y0,x1,y1 = self.CellRange(low,high)
+        found = set()
+        # When the area covers more cells than are in use, it is quicker to check each cell in use
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            for (x,y),cell in self.cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    found.update(cell)
+            return found
+        for x in range(x0,x1+1):
+            for y in range(y0,y1+1):
+                if (x,y) in self.cells:
+                    found.update(self.cells[(x,y)])
+        return found
+    def __contains__(self,object):
+        return object in self.ranges
@@ -0,0 +1,17 @@
+# Shared setup for the tests, which run without a display
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER","dummy")
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+# Returns the shared memory of a new, empty environment, with the same values main.py starts with
+# The screen size is fixed, as there is no desktop to take it from
+@pytest.fixture
+def sharedMemory():
+    pygame = pytest.importorskip("pygame")
+    pygame.init()
+    from memory import CreateSharedMemory
+    return CreateSharedMemory((1600,900),(0.3,1.6))
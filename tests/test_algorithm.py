@@ -0,0 +1,61 @@
+# Tests for setting up SPAs in algorithm.py
+
+import math
+import random
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("pygame_gui")
+
+from pygame.math import Vector2
+from graph import Node, Edge, GenerateGraph
+from algorithm import GetView, SearchState, AStarSteps
+from solver import BidirectionalSearch, DistanceHeuristic, Search
+
+def test_view_reused_until_graph_changes(sharedMemory):
+    a = Node(sharedMemory,Vector2(0,0))
+    b = Node(sharedMemory,Vector2(100,0))
+    Edge(sharedMemory,a,b,weight = 4)
+    nodes,view = GetView(sharedMemory)
+    assert GetView(sharedMemory)[1] is view
+    # Moving a node doesn't change the graph, but the view sees where it is now
+    b.position.update(300,50)
+    assert GetView(sharedMemory)[1] is view
+    assert view.positions[nodes.index(b)] == (300,50)
+    # Adding a node does change the graph
+    c = Node(sharedMemory,Vector2(0,100))
+    nodes,view = GetView(sharedMemory)
+    assert len(view) == 3 and nodes[view.index[c.id]] == c
+
+def test_search_state_for_bidirectional_search(sharedMemory):
+    a = Node(sharedMemory,Vector2(0,0))
+    b = Node(sharedMemory,Vector2(100,0))
+    Edge(sharedMemory,a,b,weight = 4)
+    nodes,view = GetView(sharedMemory)
+    state = SearchState(BidirectionalSearch(view,view.index[a.id],view.index[b.id]),view)
+    assert state.Get(a,"hCost") == 0 and state.Get(a,"tCost") == 0
+    assert state.Get(b,"tCost") == math.inf
+
+# Returns the explanation of each step of an A* run, calling pause after the given number of steps
+def AStarExplanations(sharedMemory,nodes,view,pauseAfter = None,pause = None):
+    start,end = 0,len(view) - 1
+    search = Search(view,start,end,DistanceHeuristic(view,end,sharedMemory["HeuristicMultiplier"]))
+    sharedMemory["SearchState"] = SearchState(search,view)
+    explanations = []
+    for step in AStarSteps(sharedMemory,nodes,search):
+        explanations.append(step.explanation)
+        if len(explanations) == pauseAfter:
+            pause()
+    return explanations
+
+def test_astar_steps_ignore_nodes_moved_during_run(sharedMemory):
+    random.seed(3)
+    GenerateGraph(sharedMemory,150,225)
+    nodes,view = GetView(sharedMemory)
+    expected = AStarExplanations(sharedMemory,nodes,view)
+    # Move every node part way through the run, as the layout does while the user steps through it
+    def MoveNodes():
+        for node in nodes:
+            node.position += Vector2(random.uniform(-2000,2000),random.uniform(-2000,2000))
+    assert AStarExplanations(sharedMemory,nodes,view,4,MoveNodes) == expected
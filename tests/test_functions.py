@@ -0,0 +1,124 @@
+# Tests for the helper functions in functions.py
+
+import math
+import os
+import random
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("pygame_gui")
+
+from pygame.math import Vector2
+from graph import Node, Edge
+from functions import Select, EnvToScn, GetProperty, SeekStep, ForwardSteps, ApplyStep, RestartSteps, RefreshLabels, SEARCH_ATTRIBUTES
+from algorithm import Dijkstra, AStar
+from memory import CreateSharedMemory
+from gui import GenerateUI
+
+def test_select_picks_node_drawn_on_top(sharedMemory):
+    a = Node(sharedMemory,Vector2(0,0))
+    b = Node(sharedMemory,Vector2(10,0))
+    position = EnvToScn(Vector2(5,0),sharedMemory)
+    assert Select(sharedMemory,position) == b
+    # A node given back an older id, as when a deletion is undone, is still drawn on top as it is last in the list of nodes
+    c = Node(sharedMemory,Vector2(5,0),id = 0)
+    assert sharedMemory["Nodes"][-1] == c
+    assert Select(sharedMemory,position) == c
+
+# Returns the root container of the program's UI, which SPAs show their steps in
+@pytest.fixture
+def root(sharedMemory,monkeypatch):
+    # The theme is loaded from the program's folder
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    screen,manager = GenerateUI(sharedMemory["ScreenSize"])
+    return manager.get_root_container()
+
+# Generates the same graph each time, with a SPA set up from its first node to its last
+# Positions are chosen here rather than by the layout so the A* heuristic is the same each time
+def BuildGraph(sharedMemory):
+    generator = random.Random(5)
+    nodes = [Node(sharedMemory,Vector2(generator.uniform(-3000,3000),generator.uniform(-3000,3000))) for i in range(40)]
+    # A path through every node in a random order keeps the graph connected, and more edges are added across it
+    order = generator.sample(nodes,len(nodes))
+    pairs = list(zip(order,order[1:])) + [generator.sample(nodes,2) for i in range(30)]
+    for a,b in pairs:
+        if b not in a.connectedNodes:
+            Edge(sharedMemory,a,b,weight = generator.randint(5,30))
+    sharedMemory["SPAStartNode"] = sharedMemory["Nodes"][0].id
+    sharedMemory["SPAEndNode"] = sharedMemory["Nodes"][-1].id
+    # Checkpoints are recorded often and thinned out quickly so seeks cross many of them
+    sharedMemory["CheckpointInterval"] = 3
+    sharedMemory["MaxCheckpoints"] = 4
+
+# Starts a SPA and applies its first step, as the start button does
+def StartRun(sharedMemory,root,algorithm):
+    sharedMemory["MainUIManager"] = root.ui_manager
+    algorithm(sharedMemory,root)
+    ApplyStep(sharedMemory,root)
+
+# Returns everything the permanent operations of a SPA can change, including the text of every label
+def GraphState(sharedMemory):
+    state = []
+    for node in sharedMemory["Nodes"]:
+        costs = []
+        if not sharedMemory["Edit"]:
+            costs = [GetProperty(sharedMemory,node,attr) for attr in SEARCH_ATTRIBUTES]
+        state.append((node.id,node.colour,node.outlineColour,costs))
+    for edge in sharedMemory["Edges"]:
+        state.append((edge.id,edge.colour,edge.outlineColour,edge.weight))
+    # Labels are brought up to date as they would be when drawn
+    for object in sharedMemory["Nodes"] + sharedMemory["Edges"]:
+        if object.label.version != sharedMemory["LabelVersion"]:
+            object.UpdateLabel(sharedMemory)
+        state.append(object.label.text)
+    return state
+
+# Returns the state of the graph at the current step, without the step's temporary operations
+def PermanentState(sharedMemory):
+    step = sharedMemory["Steps"][sharedMemory["Step"]]
+    for temp in step.tempOps:
+        temp.Backward(sharedMemory)
+    state = GraphState(sharedMemory)
+    for temp in step.tempOps:
+        temp.Forward(sharedMemory)
+    return state
+
+# Returns the state of the graph after applying every step up to step n in order on a new run
+def ReplayState(root,algorithm,n):
+    sharedMemory = CreateSharedMemory((1600,900),(0.3,1.6))
+    BuildGraph(sharedMemory)
+    StartRun(sharedMemory,root,algorithm)
+    steps = sharedMemory["Steps"]
+    ForwardSteps(sharedMemory,steps,1,n)
+    sharedMemory["Step"] = n
+    return GraphState(sharedMemory)
+
+@pytest.mark.parametrize("algorithm",[Dijkstra,AStar])
+def test_seek_matches_replay(sharedMemory,root,algorithm):
+    BuildGraph(sharedMemory)
+    StartRun(sharedMemory,root,algorithm)
+    # Forward and back across checkpoints, onto checkpoints, past the end and back to the start
+    for n in (7,2,20,9,9,3,math.inf,1,15,0,12):
+        SeekStep(sharedMemory,root,n)
+        assert PermanentState(sharedMemory) == ReplayState(root,algorithm,sharedMemory["Step"])
+    # Stepping backward from a step which was seeked to undoes one step at a time
+    for i in range(3):
+        ApplyStep(sharedMemory,root,-1)
+        assert PermanentState(sharedMemory) == ReplayState(root,algorithm,sharedMemory["Step"])
+    # Checkpoints were thinned out to stay within the limit
+    assert sharedMemory["Steps"].interval > 3
+    assert len(sharedMemory["Steps"].checkpoints) <= sharedMemory["MaxCheckpoints"]
+
+@pytest.mark.parametrize("algorithm",[Dijkstra,AStar])
+def test_ending_run_restores_graph(sharedMemory,root,algorithm):
+    BuildGraph(sharedMemory)
+    original = GraphState(sharedMemory)
+    StartRun(sharedMemory,root,algorithm)
+    for n in (20,math.inf,5):
+        SeekStep(sharedMemory,root,n)
+    # End the run as the quit button does
+    sharedMemory["Edit"] = True
+    RestartSteps(sharedMemory,root,True)
+    RefreshLabels(sharedMemory)
+    assert GraphState(sharedMemory) == original
@@ -0,0 +1,23 @@
+# Tests for building graphs in graph.py
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("pygame_gui")
+
+from pygame.math import Vector2
+from graph import LoadGraph
+
+def test_parallel_edges_keep_lowest_weight(sharedMemory):
+    nodeData = [(Vector2(i * 300,0),f"N{i}","#f42e2e",None,50,i) for i in range(3)]
+    # Edges are saved as (nodeA id, nodeB id, colour, outline colour, name, weight, length, width, id)
+    edgeData = [
+        (0,1,"#5e6060",None,None,20,10,25,0),
+        (1,2,"#5e6060",None,None,7,10,25,1),
+        (1,0,"#5e6060",None,None,5,10,25,2),
+        (0,1,"#5e6060",None,None,12,10,25,3)
+    ]
+    assert LoadGraph(sharedMemory,(nodeData,edgeData,3,4)) == 2
+    assert sorted((edge.id,edge.weight) for edge in sharedMemory["Edges"]) == [(1,7),(2,5)]
+    a,b,c = sharedMemory["Nodes"]
+    assert a.GetEdgeTo(b).weight == 5
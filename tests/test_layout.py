@@ -0,0 +1,116 @@
+# Tests for the layout engine in layout.py
+
+import random
+import time
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("pygame")
+
+from pygame.math import Vector2
+from graph import Node, GenerateGraph
+from layout import LayoutEngine, LayoutWorker, LongRangeForces, Readjust, ToggleLongRangeForces, LONG_RANGE_STRENGTH
+
+# Returns the long-range repulsion on every node found by comparing every pair of nodes
+def ExactForces(positions,maxForce,optimalDistance):
+    offsets = positions[None,:,:] - positions[:,None,:]
+    distances = numpy.hypot(offsets[...,0],offsets[...,1])
+    numpy.fill_diagonal(distances,numpy.inf)
+    forces = -LONG_RANGE_STRENGTH * maxForce * numpy.minimum(1,(optimalDistance / distances)**2) / distances
+    return (forces * offsets[...,0]).sum(axis = 1),(forces * offsets[...,1]).sum(axis = 1)
+
+# Returns the error of the Barnes-Hut forces compared to the exact forces, relative to the size of the exact forces
+def LongRangeError(positions,theta):
+    exactX,exactY = ExactForces(positions,500,500)
+    forceX,forceY = LongRangeForces(positions,500,500,theta)
+    return numpy.hypot(forceX - exactX,forceY - exactY).sum() / numpy.hypot(exactX,exactY).sum()
+
+def test_long_range_error_falls_with_theta():
+    random = numpy.random.default_rng(0)
+    # Two clusters of nodes, so that there are groups both near and far from every node
+    positions = numpy.concatenate((random.normal(0,3000,(300,2)),random.normal(20000,2000,(300,2))))
+    errors = [LongRangeError(positions,theta) for theta in (1,0.8,0.5,0.3,0.1)]
+    assert all(a > b for a,b in zip(errors,errors[1:]))
+    assert errors[-1] < 0.001
+
+def test_long_range_forces_are_exact_without_approximation():
+    random = numpy.random.default_rng(1)
+    positions = random.uniform(-5000,5000,(200,2))
+    assert LongRangeError(positions,0) < 1e-9
+
+# Runs the layout until it goes to sleep, returning the number of frames it took
+def FramesUntilAsleep(sharedMemory,limit):
+    for frame in range(limit):
+        Readjust(sharedMemory,1 / 60)
+        if sharedMemory["LayoutAsleep"]:
+            return frame + 1
+    return None
+
+def test_settled_graph_sleeps_and_wakes(sharedMemory):
+    random.seed(0)
+    GenerateGraph(sharedMemory,200,300)
+    assert FramesUntilAsleep(sharedMemory,1200) != None
+    # Nothing moves while the layout is asleep
+    positions = [Vector2(node.position) for node in sharedMemory["Nodes"]]
+    Readjust(sharedMemory,1 / 60)
+    assert [node.position for node in sharedMemory["Nodes"]] == positions
+    # Dragging a node wakes the layout
+    node = sharedMemory["Nodes"][0]
+    sharedMemory["Selected"] = [node]
+    sharedMemory["Drag"] = True
+    node.velocity = Vector2(3000,0)
+    Readjust(sharedMemory,1 / 60)
+    assert not sharedMemory["LayoutAsleep"]
+    assert node.position != positions[0]
+    sharedMemory["Drag"] = False
+    assert FramesUntilAsleep(sharedMemory,1200) != None
+    # So does editing the graph
+    Node(sharedMemory,Vector2(node.position))
+    Readjust(sharedMemory,1 / 60)
+    assert not sharedMemory["LayoutAsleep"]
+
+def test_connected_nodes_in_same_place_are_not_repelled(sharedMemory):
+    # Two connected nodes in the same place, with an edge which wants them there
+    # Their repulsion is added with every nearby pair and taken away again for connected pairs, so nothing should move them
+    engine = LayoutEngine()
+    engine.Load(numpy.zeros((2,2)),numpy.array([0]),numpy.array([1]),numpy.array([0.0]))
+    for i in range(10):
+        engine.Advance(sharedMemory,1 / 60,{})
+    assert (engine.positions == 0).all()
+    # Nodes which aren't connected are still pushed apart
+    engine.Load(numpy.zeros((2,2)),numpy.array([],dtype = numpy.int64),numpy.array([],dtype = numpy.int64),numpy.array([]))
+    engine.Advance(sharedMemory,1 / 60,{})
+    assert numpy.hypot(*(engine.positions[1] - engine.positions[0])) > 1
+
+def test_long_range_toggle_needs_numpy_layout(sharedMemory):
+    assert ToggleLongRangeForces(sharedMemory)
+    assert sharedMemory["LongRangeForces"]
+    # The Python layout can't calculate long-range forces, so the toggle is refused
+    sharedMemory["LayoutMode"] = "Python"
+    assert not ToggleLongRangeForces(sharedMemory)
+    assert sharedMemory["LongRangeForces"]
+
+def test_worker_publishes_positions_and_stops(sharedMemory):
+    sharedMemory["LayoutMode"] = "Worker"
+    # Nodes piled up close together are always pushed apart
+    generator = random.Random(0)
+    nodes = [Node(sharedMemory,Vector2(generator.uniform(-50,50),generator.uniform(-50,50))) for i in range(10)]
+    start = [Vector2(node.position) for node in nodes]
+    Readjust(sharedMemory,1 / 60)
+    worker = sharedMemory["Layout"]
+    assert type(worker) == LayoutWorker
+    # Wait for the worker to publish positions for the copy of the graph it was sent
+    deadline = time.perf_counter() + 5
+    while time.perf_counter() < deadline:
+        with worker.lock:
+            if worker.fresh and worker.published == worker.engine:
+                break
+        time.sleep(0.01)
+    else:
+        pytest.fail("The worker didn't publish any positions")
+    # The mainloop moves the nodes to the published positions
+    Readjust(sharedMemory,1 / 60)
+    assert [node.position for node in nodes] != start
+    worker.Stop()
+    assert not worker.thread.is_alive()
@@ -0,0 +1,56 @@
+# Tests for the undoable operations in operations.py
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("pygame_gui")
+
+from pygame.math import Vector2
+from graph import Node, Edge
+from functions import ApplyPending
+from operations import ChangeProperty
+
+# Returns the properties the changes in these tests make
+def State(node,edge):
+    return (node.colour,node.outlineColour,edge.weight,edge.label.text)
+
+# Returns a chain of changes to the same properties of a node and an edge, which have not been applied yet
+def Changes(sharedMemory,node,edge):
+    changes = []
+    for colour,weight in (("#ff0000",4),("#00ff00",9),("#0000ff",2)):
+        changes.append(ChangeProperty(sharedMemory,False,object = node,attr = "colour",value = colour))
+        changes.append(ChangeProperty(sharedMemory,False,object = edge,attr = "weight",value = weight))
+    changes.append(ChangeProperty(sharedMemory,False,object = node,attr = "outlineColour",value = "#00d0f9"))
+    return changes
+
+def test_folded_changes_match_individual_changes(sharedMemory):
+    a = Node(sharedMemory,Vector2(0,0))
+    b = Node(sharedMemory,Vector2(500,0))
+    edge = Edge(sharedMemory,a,b,weight = 10)
+    # The state before each change, and after the last one
+    states = [State(a,edge)]
+    individual = Changes(sharedMemory,a,edge)
+    for change in individual:
+        change.Forward(sharedMemory)
+        states.append(State(a,edge))
+    # Undoing each change steps back through the same states
+    for i,change in enumerate(reversed(individual)):
+        change.Backward(sharedMemory)
+        assert State(a,edge) == states[-2 - i]
+
+    # Folding the changes sets each property once, to the value of its last change
+    folded = Changes(sharedMemory,a,edge)
+    pending = {}
+    for change in folded:
+        change.Fold(sharedMemory,pending)
+    assert len(pending) == 3
+    ApplyPending(sharedMemory,pending)
+    assert State(a,edge) == states[-1]
+    # Each folded change still undoes to the value before it, as the individual changes do
+    for i,change in enumerate(reversed(folded)):
+        change.Backward(sharedMemory)
+        assert State(a,edge) == states[-2 - i]
+    # Applying a folded change again gives the same state as applying it on its own
+    for i,change in enumerate(folded):
+        change.Forward(sharedMemory)
+        assert State(a,edge) == states[i + 1]
@@ -0,0 +1,35 @@
+# Tests for drawing the environment in render.py
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from pygame.math import Vector2
+from graph import Node, Edge
+from render import DrawGraph, DetailLevel, LOD_FULL, LOD_NO_LABELS, LOD_POINTS
+
+def test_labels_drawn_at_default_scale(sharedMemory):
+    # A small graph at the scale the program starts at
+    a = Node(sharedMemory,Vector2(-300,0))
+    b = Node(sharedMemory,Vector2(300,0))
+    c = Node(sharedMemory,Vector2(0,400))
+    Edge(sharedMemory,a,b)
+    Edge(sharedMemory,b,c)
+    assert sharedMemory["Scale"] == sharedMemory["ScaleBounds"][0]
+    assert DetailLevel(sharedMemory,sharedMemory["Nodes"]) == LOD_FULL
+    DrawGraph(pygame.Surface((1600,900)),sharedMemory,(210,210,210))
+    objects = sharedMemory["Nodes"] + sharedMemory["Edges"]
+    assert sharedMemory["Labels"].drawn == {object.label for object in objects}
+    assert all(object.label.surface != None for object in objects)
+
+def test_detail_level_follows_scale(sharedMemory):
+    # The same crowd of nodes on screen gets more detail as they are drawn larger
+    nodes = [Node(sharedMemory,Vector2(i,0)) for i in range(400)]
+    levels = []
+    for scale in (0.3,0.6,1.6,0.6,0.3):
+        sharedMemory["Scale"] = scale
+        levels.append(DetailLevel(sharedMemory,nodes))
+    assert levels == [LOD_POINTS,LOD_NO_LABELS,LOD_FULL,LOD_NO_LABELS,LOD_POINTS]
+    # Fewer nodes are drawn in full detail even when zoomed out
+    sharedMemory["Scale"] = 0.3
+    assert DetailLevel(sharedMemory,nodes[:50]) == LOD_FULL
@@ -0,0 +1,121 @@
+# Tests for the headless shortest path solvers in solver.py
+
+import math
+import random
+
+from solver import GraphView, Landmarks, Search, DistanceHeuristic, DijkstraPath, BidirectionalDijkstraPath, LandmarkAStarPath
+
+# Returns a random graph view with some nodes left without any edges
+def RandomView(seed,n = 60,edgeCount = 90,maxWeight = 30):
+    generator = random.Random(seed)
+    adjacency = [[] for i in range(n)]
+    pairs = set()
+    while len(pairs) < edgeCount:
+        # The last few nodes are never connected
+        a,b = generator.sample(range(n - 5),2)
+        if (a,b) in pairs or (b,a) in pairs:
+            continue
+        pairs.add((a,b))
+        weight = generator.randint(1,maxWeight)
+        adjacency[a].append((b,weight))
+        adjacency[b].append((a,weight))
+    positions = [(generator.uniform(0,1000),generator.uniform(0,1000)) for i in range(n)]
+    return GraphView([i + 100 for i in range(n)],adjacency,positions)
+
+# Returns the total weight of a path of node ids
+def PathCost(view,path):
+    cost = 0
+    for a,b in zip(path,path[1:]):
+        cost += dict(view.adjacency[view.index[a]])[view.index[b]]
+    return cost
+
+# Checks a search gives the same cost as Dijkstra's, and that its path is a real route with that cost
+def CheckAgainstDijkstra(view,result,start,end):
+    expected = DijkstraPath(view,start,end)
+    assert result.cost == expected.cost
+    if expected.path == None:
+        assert result.path == None
+    else:
+        assert result.path[0] == start and result.path[-1] == end
+        assert PathCost(view,result.path) == expected.cost
+
+def test_searches_match_dijkstra():
+    for seed in range(5):
+        view = RandomView(seed)
+        landmarks = Landmarks(view,4)
+        ids = view.ids
+        generator = random.Random(seed)
+        queries = [tuple(generator.sample(ids,2)) for i in range(40)]
+        # The start node is the end node, including for a node without any edges
+        queries += [(ids[0],ids[0]),(ids[-1],ids[-1])]
+        for start,end in queries:
+            CheckAgainstDijkstra(view,BidirectionalDijkstraPath(view,start,end),start,end)
+            CheckAgainstDijkstra(view,LandmarkAStarPath(view,start,end,landmarks),start,end)
+
+def test_route_to_itself():
+    view = RandomView(0)
+    for id in (view.ids[0],view.ids[-1]):
+        for result in (DijkstraPath(view,id,id),BidirectionalDijkstraPath(view,id,id)):
+            assert result.path == [id]
+            assert result.cost == 0
+
+# Returns a graph view of a square grid, with some nodes without any edges given the last indices
+def GridView(size,isolated = 0):
+    n = size * size
+    adjacency = [[] for i in range(n + isolated)]
+    for i in range(n):
+        x,y = i % size, i // size
+        for other in ([i + 1] if x < size - 1 else []) + ([i + size] if y < size - 1 else []):
+            adjacency[i].append((other,1))
+            adjacency[other].append((i,1))
+    positions = [(i % size * 100,i // size * 100) for i in range(n)] + [(-100,-100)] * isolated
+    return GraphView(list(range(n + isolated)),adjacency,positions)
+
+def test_landmarks_ignore_isolated_nodes():
+    view = GridView(20,isolated = 8)
+    landmarks = Landmarks(view,8)
+    assert len(landmarks.landmarks) == 8
+    assert all(landmark < 400 for landmark in landmarks.landmarks)
+    # The grid's corners are the furthest apart, so farthest-first starts from them
+    assert set(landmarks.landmarks[:2]) in ({0,399},{19,380})
+
+# Returns the events of a search performed by the loop used before searches were moved into solver.py
+# The unexplored node with the lowest total cost is found by scanning a list in the order nodes were found, so ties go to the node found first
+def ListSearchEvents(view,start,end,heuristic = None):
+    if heuristic == None:
+        heuristic = lambda i: 0
+    cost = [math.inf] * len(view)
+    explored = [False] * len(view)
+    cost[start] = 0
+    events = []
+    unexplored = [start]
+    while unexplored != []:
+        best = unexplored[0]
+        for node in unexplored:
+            if cost[node] + heuristic(node) < cost[best] + heuristic(best):
+                best = node
+        explored[best] = True
+        unexplored.remove(best)
+        events.append(("Select",best))
+        if best == end:
+            break
+        for node,weight in view.adjacency[best]:
+            if cost[best] + weight < cost[node]:
+                events.append(("Cost",node,best,cost[node],cost[best] + weight))
+                cost[node] = cost[best] + weight
+            if node not in unexplored and not explored[node]:
+                unexplored.append(node)
+    return events
+
+def test_search_events_match_list_search():
+    for seed in range(100):
+        # Low weights and whole number positions give many ties
+        view = RandomView(seed,30,45,maxWeight = 3)
+        view.positions = [(int(x),int(y)) for x,y in view.positions]
+        generator = random.Random(seed)
+        start,end = generator.sample(range(len(view)),2)
+        assert list(Search(view,start,end).Events()) == ListSearchEvents(view,start,end)
+        # The larger multiplier gives a heuristic which can overestimate, so explored nodes can still have their costs lowered
+        for multiplier in (0.008,0.05):
+            heuristic = DistanceHeuristic(view,end,multiplier)
+            assert list(Search(view,start,end,heuristic).Events()) == ListSearchEvents(view,start,end,heuristic)